@@ -1,6 +1,8 @@
 from django.contrib import admin
+from django.db import transaction
 
-from .models import Category, Comment, Location, Post
+from .models import AuthorStats, Category, Comment, Location, Post
+from .search import search_posts
 
 
 @admin.register(Category)
@@ -10,7 +12,13 @@ class CategoryAdmin(admin.ModelAdmin):
     """
 
     list_display = (
-        "title", "description", "slug", "is_published", "created_at"
+        "title",
+        "description",
+        "slug",
+        "is_published",
+        "post_count",
+        "latest_pub_date",
+        "created_at",
     )
     list_editable = ("is_published", "slug")
     search_fields = (
@@ -42,11 +50,25 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ("is_published", "category")
     search_fields = (
         "title",
-        "author",
+        "text",
     )
     list_filter = ("category",)
     list_display_links = ("title",)
 
+    def save_model(self, request, obj, form, change):
+        """Пересчитать число публикаций авторов, если пост передан другому."""
+        super().save_model(request, obj, form, change)
+        if change and "author" in form.changed_data:
+            AuthorStats.objects.refresh_for(
+                {obj.author_id, form.initial.get("author")}
+            )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Искать по полнотекстовому индексу вместо LIKE '%...%'."""
+        if not search_term:
+            return queryset, False
+        return search_posts(queryset, search_term), False
+
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
@@ -61,3 +83,24 @@ class CommentAdmin(admin.ModelAdmin):
         "text",
     )
     list_display_links = ("post",)
+
+    def save_model(self, request, obj, form, change):
+        """
+        Сохранить коммент и пересчитать счётчик комментов поста,
+        если коммент опубликован/снят с публикации или перенесён.
+        """
+        super().save_model(request, obj, form, change)
+        if change and not {"is_published", "post"} & set(form.changed_data):
+            return
+        post_ids = {obj.post_id, form.initial.get("post")}
+        Post.objects.filter(pk__in=post_ids).refresh_comment_count()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        Post.objects.filter(pk=obj.post_id).refresh_comment_count()
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            post_ids = set(queryset.values_list("post_id", flat=True))
+            super().delete_queryset(request, queryset)
+            Post.objects.filter(pk__in=post_ids).refresh_comment_count()
@@ -0,0 +1,173 @@
+import hashlib
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.translation import get_language
+
+from .models import Post
+
+POST_CARD_TIMEOUT = 60 * 60 * 24
+LOCAL_CACHE_TIMEOUT = 60
+CARD_RELATED_FIELDS = ("author", "category", "location")
+PAGE_CACHE_TIMEOUT = 60
+PAGE_GENERATION_KEY = "blog:page:generation"
+
+
+def versioned_timeout(timeout):
+    """
+    Срок жизни фрагмента, который сбрасывается сменой счётчика версии.
+    В кеше процесса (LocMemCache) счётчики видны только этому процессу,
+    а остальные отдают старые фрагменты, пока те не истекут, — поэтому
+    срок не больше BLOG_LOCAL_CACHE_TIMEOUT. В общем кеше (Memcached,
+    Redis) счётчики у всех процессов одни, и срок не урезается.
+    """
+    if not isinstance(caches["default"], LocMemCache):
+        return timeout
+    return min(
+        timeout,
+        getattr(settings, "BLOG_LOCAL_CACHE_TIMEOUT", LOCAL_CACHE_TIMEOUT),
+    )
+
+
+def version_key(model, pk):
+    return f"blog:version:{model._meta.label_lower}:{pk}"
+
+
+def get_versions(model, pks):
+    """
+    Получить версии объектов одним запросом к кешу.
+    Пропавшие из кеша версии заводятся заново значением от времени,
+    чтобы не совпасть с версией, под которой лежат старые фрагменты.
+    """
+    keys = {version_key(model, pk): pk for pk in pks if pk is not None}
+    found = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return {pk: found[key] for key, pk in keys.items()}
+
+
+def bump_counter(key):
+    """Увеличить счётчик версии в кеше, заведя его при отсутствии."""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def bump_version(model, pk):
+    """Сменить версию объекта, сделав недоступными его фрагменты."""
+    bump_counter(version_key(model, pk))
+
+
+def post_card_keys(posts):
+    """Ключи кеша карточек для публикаций одной страницы ленты."""
+    posts = list(posts)
+    versions = {
+        field: get_versions(
+            Post._meta.get_field(field).related_model,
+            {getattr(post, f"{field}_id") for post in posts},
+        )
+        for field in CARD_RELATED_FIELDS
+    }
+    language = get_language()
+    keys = {}
+    for post in posts:
+        parts = [
+            language, post.pk, post.updated_at.timestamp(), post.comment_count
+        ]
+        parts.extend(
+            versions[field].get(getattr(post, f"{field}_id"))
+            for field in CARD_RELATED_FIELDS
+        )
+        keys[post.pk] = "blog:post_card:" + ":".join(map(str, parts))
+    return keys
+
+
+def prefetch_post_cards(posts):
+    """
+    Подставить публикациям готовые карточки из кеша:
+    по одной выборке версий на связанную модель и одна — самих карточек.
+    """
+    posts = list(posts)
+    keys = post_card_keys(posts)
+    cards = cache.get_many(keys.values())
+    for post in posts:
+        post.card_cache_key = keys[post.pk]
+        post.cached_card = cards.get(post.card_cache_key)
+
+
+def render_post_card(post):
+    """Отрисовать карточку публикации, взяв её из кеша, если она там есть."""
+    if not hasattr(post, "card_cache_key"):
+        prefetch_post_cards([post])
+    if post.cached_card is not None:
+        return post.cached_card
+    card = render_to_string("includes/post_card.html", {"post": post})
+    cache.set(
+        post.card_cache_key, card, versioned_timeout(POST_CARD_TIMEOUT)
+    )
+    return card
+
+
+def bump_page_generation():
+    """Сбросить все закешированные страницы для анонимов."""
+    bump_counter(PAGE_GENERATION_KEY)
+
+
+def page_generation():
+    """Текущее поколение страниц; меняется при любой правке содержимого."""
+    generation = cache.get(PAGE_GENERATION_KEY)
+    if generation is None:
+        cache.add(PAGE_GENERATION_KEY, time.time_ns(), None)
+        generation = cache.get(PAGE_GENERATION_KEY, time.time_ns())
+    return generation
+
+
+def page_cache_key(request):
+    """Ключ страницы: поколение кеша, язык и полный путь запроса."""
+    path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"blog:page:{page_generation()}:{get_language()}:{path}"
+
+
+def page_etag(request, last_modified, *extra):
+    """
+    ETag страницы для конкретного пользователя.
+    Поколение страниц учитывает удаления и правки категорий и мест,
+    которые не оставляют следа в датах изменения публикаций;
+    extra — состояние страницы, видимое только этому пользователю.
+    """
+    user_id = request.user.pk if request.user.is_authenticated else ""
+    parts = (
+        request.get_full_path(),
+        user_id,
+        last_modified.timestamp(),
+        page_generation(),
+        get_language(),
+        *extra,
+    )
+    return hashlib.md5(":".join(map(str, parts)).encode()).hexdigest()
+
+
+def page_cache_timeout(timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Срок жизни страницы: не дольше timeout
+    и не дольше, чем до ближайшей отложенной публикации.
+    """
+    now = timezone.now()
+    next_pub_date = (
+        Post.objects.filter(is_published=True, pub_date__gt=now)
+        .order_by("pub_date")
+        .values_list("pub_date", flat=True)
+        .first()
+    )
+    if next_pub_date is None:
+        return timeout
+    seconds_left = math.ceil((next_pub_date - now).total_seconds())
+    return max(1, min(timeout, seconds_left))
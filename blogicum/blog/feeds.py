@@ -0,0 +1,243 @@
+import hashlib
+import time
+
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpRequest, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from .caching import bump_counter, page_cache_timeout, versioned_timeout
+from .lookups import get_published_category, get_user_by_username
+from .models import Category, Post
+from .sites import site_scheme
+from .tasks import run_in_background
+
+FEED_ITEMS = 20
+FEED_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_FORMATS = ("rss", "atom")
+
+
+def feed_scopes(category_id=None, author_id=None):
+    """Ленты, в которые попадает пост этой категории и этого автора."""
+    scopes = ["all"]
+    if category_id is not None:
+        scopes.append(f"category:{category_id}")
+    if author_id is not None:
+        scopes.append(f"author:{author_id}")
+    return scopes
+
+
+def author_feed_scopes(author_id):
+    """
+    Ленты, в записях которых выводится имя автора: общая, его
+    собственная и ленты категорий с его постами.
+    """
+    scopes = set(feed_scopes(author_id=author_id))
+    category_ids = (
+        Post.objects.filter(author_id=author_id)
+        .order_by()
+        .values_list("category_id", flat=True)
+        .distinct()
+    )
+    for category_id in category_ids:
+        scopes.update(feed_scopes(category_id=category_id))
+    return sorted(scopes)
+
+
+def category_feed_scopes(category_id):
+    """
+    Ленты, в записях которых выводится название категории: общая,
+    её собственная и ленты авторов её постов.
+    """
+    scopes = set(feed_scopes(category_id=category_id))
+    author_ids = (
+        Post.objects.filter(category_id=category_id)
+        .order_by()
+        .values_list("author_id", flat=True)
+        .distinct()
+    )
+    for author_id in author_ids:
+        scopes.update(feed_scopes(author_id=author_id))
+    return sorted(scopes)
+
+
+def feed_version_key(scope):
+    return f"blog:feed:version:{scope}"
+
+
+def feed_origin_key(scope, fmt):
+    return f"blog:feed:origin:{scope}:{fmt}"
+
+
+def feed_version(scope):
+    """Версия ленты; меняется при изменении попадающих в неё постов."""
+    key = feed_version_key(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key, time.time_ns())
+    return version
+
+
+def feed_cache_key(scope, fmt):
+    return f"blog:feed:{scope}:{fmt}:{feed_version(scope)}:{get_language()}"
+
+
+class PostsFeed(Feed):
+    """RSS опубликованных постов: всех, категории или автора."""
+
+    feed_type = Rss201rev2Feed
+
+    def get_object(self, request, slug=None, username=None):
+        if slug is not None:
+            return get_published_category(slug)
+        if username is not None:
+            return get_user_by_username(username)
+        return None
+
+    def title(self, obj):
+        if obj is None:
+            return "Блогикум"
+        if isinstance(obj, Category):
+            return f"Блогикум: {obj.title}"
+        return f"Блогикум: публикации {obj.username}"
+
+    def link(self, obj):
+        if obj is None:
+            return reverse("blog:index")
+        if isinstance(obj, Category):
+            return reverse("blog:category", args=[obj.slug])
+        return reverse("blog:profile", args=[obj.username])
+
+    def description(self, obj):
+        if isinstance(obj, Category):
+            return obj.description
+        return "Свежие публикации Блогикума."
+
+    def items(self, obj):
+        posts = Post.objects.for_cards().published()
+        if isinstance(obj, Category):
+            posts = posts.filter(category=obj)
+        elif obj is not None:
+            posts = posts.filter(author=obj)
+        return posts.order_by("-pub_date", "-id")[:FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.updated_at
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class AtomPostsFeed(PostsFeed):
+    feed_type = Atom1Feed
+    subtitle = PostsFeed.description
+
+
+FEEDS = {"rss": PostsFeed(), "atom": AtomPostsFeed()}
+
+
+class SiteRequest(HttpRequest):
+    """
+    Запрос к ленте от имени сайта, а не читателя: ссылки строятся
+    от текущего сайта и BLOG_SITE_SCHEME, и лента одинакова для всех
+    и при отрисовке в фоне.
+    """
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = self.path_info = path
+
+    def _get_scheme(self):
+        return site_scheme()
+
+
+def render_feed(path, scope, fmt, **kwargs):
+    """
+    Отрисовать ленту и положить её в кеш вместе с ETag и Last-Modified.
+    Запоминается путь ленты, чтобы после сброса перерисовать её в фоне,
+    не дожидаясь читателя.
+    """
+    feed = FEEDS[fmt]
+    request = SiteRequest(path)
+    feedgen = feed.get_feed(feed.get_object(request, **kwargs), request)
+    content = feedgen.writeString("utf-8").encode()
+    entry = {
+        "content": content,
+        "content_type": feedgen.content_type,
+        "etag": quote_etag(hashlib.md5(content).hexdigest()),
+        "last_modified": int(feedgen.latest_post_date().timestamp()),
+    }
+    cache.set(
+        feed_cache_key(scope, fmt),
+        entry,
+        page_cache_timeout(versioned_timeout(FEED_CACHE_TIMEOUT)),
+    )
+    cache.set(
+        feed_origin_key(scope, fmt), (path, kwargs), FEED_CACHE_TIMEOUT
+    )
+    return entry
+
+
+def serve_feed(request, fmt, slug=None, username=None):
+    """Готовая лента из кеша с ответом 304 на повторный запрос."""
+    if fmt not in FEEDS:
+        raise Http404("Неизвестный формат ленты.")
+    kwargs = {}
+    scope = "all"
+    if slug is not None:
+        kwargs["slug"] = slug
+        scope = f"category:{get_published_category(slug).pk}"
+    elif username is not None:
+        kwargs["username"] = username
+        scope = f"author:{get_user_by_username(username).pk}"
+    entry = cache.get(feed_cache_key(scope, fmt))
+    if entry is None:
+        entry = render_feed(request.path, scope, fmt, **kwargs)
+    response = get_conditional_response(
+        request, etag=entry["etag"], last_modified=entry["last_modified"]
+    )
+    if response is None:
+        response = HttpResponse(
+            entry["content"], content_type=entry["content_type"]
+        )
+    response["ETag"] = entry["etag"]
+    response["Last-Modified"] = http_date(entry["last_modified"])
+    return response
+
+
+def prerender_feeds(scopes):
+    """Перерисовать ленты, которые уже читали, по запомненному пути."""
+    for scope in scopes:
+        for fmt in FEED_FORMATS:
+            origin = cache.get(feed_origin_key(scope, fmt))
+            if origin is None:
+                continue
+            path, kwargs = origin
+            try:
+                render_feed(path, scope, fmt, **kwargs)
+            except Http404:
+                continue
+
+
+def invalidate_feeds(scopes):
+    """Сбросить ленты и перерисовать их в фоне."""
+    for scope in scopes:
+        bump_counter(feed_version_key(scope))
+    run_in_background(prerender_feeds, list(scopes))
@@ -0,0 +1,127 @@
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .caching import bump_page_generation
+from .imaging import JPEG_QUALITY, resize_image
+from .models import Post
+from .tasks import run_in_processes
+
+VARIANT_WIDTHS = {"thumb": 320, "detail": 640, "detail_2x": 1280}
+# Карточка и страница публикации шириной 40rem, на узких экранах — во всю.
+IMAGE_SIZES = "(max-width: 40rem) 100vw, 40rem"
+VARIANTS_DIR = "variants"
+VARIANT_NAME = re.compile(
+    rf"^{VARIANTS_DIR}/(?P<stem>.+)-\d+w(?P<extension>\.\w+)?$"
+)
+
+logger = logging.getLogger(__name__)
+
+
+def variant_widths():
+    return getattr(settings, "BLOG_IMAGE_VARIANT_WIDTHS", VARIANT_WIDTHS)
+
+
+def variant_name(source, width):
+    """Имя копии рядом с остальными копиями: variants/<фото>-<ширина>w."""
+    stem, extension = os.path.splitext(source)
+    return f"{VARIANTS_DIR}/{stem}-{width}w{extension}"
+
+
+def variant_source(name):
+    """Имя фото, из которого сделана копия; None, если это не копия."""
+    match = VARIANT_NAME.match(name)
+    if match is None:
+        return None
+    return match["stem"] + (match["extension"] or "")
+
+
+def make_variants(source):
+    """Сделать копии фото в пуле процессов; вернуть их имена и размеры."""
+    quality = getattr(settings, "BLOG_IMAGE_QUALITY", JPEG_QUALITY)
+    names = {
+        kind: variant_name(source, width)
+        for kind, width in variant_widths().items()
+    }
+    for name in set(names.values()):
+        os.makedirs(os.path.dirname(default_storage.path(name)), exist_ok=True)
+    sizes = run_in_processes(
+        resize_image,
+        [
+            (
+                default_storage.path(source),
+                default_storage.path(names[kind]),
+                width,
+                quality,
+            )
+            for kind, width in variant_widths().items()
+        ],
+    )
+    return {
+        kind: {"name": names[kind], "width": width, "height": height}
+        for kind, (width, height) in zip(names, sizes)
+    }
+
+
+def build_variants(post_id):
+    """
+    Сделать копии фото публикации и сохранить их размеры в посте.
+    Карточка и страницы с постом сбрасываются, чтобы показать копии.
+    Копии лежат по имени фото и удаляются вместе с ним, когда на фото
+    не остаётся ссылок.
+    """
+    source = (
+        Post.objects.filter(pk=post_id)
+        .values_list("image", flat=True)
+        .first()
+    )
+    if source is None:
+        return
+    image_variants = {}
+    if source:
+        try:
+            image_variants = {
+                "source": source,
+                "variants": make_variants(source),
+            }
+        except OSError:
+            logger.warning("Не удалось уменьшить фото %s.", source)
+            return
+    Post.objects.filter(pk=post_id, image=source).update(
+        image_variants=image_variants, updated_at=timezone.now()
+    )
+    bump_page_generation()
+
+
+def needs_variants(post):
+    """Копии не сделаны для текущего фото поста или остались от снятого."""
+    return (post.image.name or "") != post.image_variants.get("source", "")
+
+
+def image_context(post, kind):
+    """
+    Атрибуты тега img: копия нужного вида с её размерами и srcset
+    из всех копий. Пока копий нет, выводится исходное фото.
+    """
+    context = {"original": post.image.url, "src": post.image.url}
+    main = post.image_variants.get("variants", {}).get(kind)
+    if needs_variants(post) or main is None:
+        return context
+    urls = {
+        variant["width"]: default_storage.url(variant["name"])
+        for variant in post.image_variants["variants"].values()
+    }
+    context.update(
+        src=default_storage.url(main["name"]),
+        width=main["width"],
+        height=main["height"],
+        sizes=IMAGE_SIZES,
+        srcset=", ".join(
+            f"{url} {width}w" for width, url in sorted(urls.items())
+        ),
+    )
+    return context
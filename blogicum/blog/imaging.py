@@ -0,0 +1,90 @@
+"""
+Обработка изображений в пуле процессов: модуль не зависит от Django,
+чтобы дочерние процессы импортировали его без настройки проекта.
+"""
+import os
+
+from PIL import Image, ImageOps
+
+JPEG_QUALITY = 85
+SAVE_OPTIONS = {
+    "JPEG": {"optimize": True, "progressive": True},
+    "PNG": {"optimize": True},
+    "WEBP": {"method": 6},
+}
+NO_ALPHA_FORMATS = {"JPEG"}
+MAX_SIZE = (2560, 2560)
+EXTENSIONS = {"JPEG": ".jpg", "WEBP": ".webp", "PNG": ".png"}
+METADATA_KEYS = ("exif", "xmp", "XML:com.adobe.xmp", "comment", "photoshop")
+
+
+def resize_image(source_path, target_path, width, quality=JPEG_QUALITY):
+    """
+    Уменьшить изображение до ширины width с сохранением пропорций
+    и формата. Меньшие изображения не растягиваются.
+    Возвращает размеры сохранённой копии.
+    """
+    with Image.open(source_path) as original:
+        image_format = original.format
+        image = ImageOps.exif_transpose(original)
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        if image_format in NO_ALPHA_FORMATS and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        options = dict(SAVE_OPTIONS.get(image_format, {}))
+        if image_format in ("JPEG", "WEBP"):
+            options["quality"] = quality
+        # Копию видят сразу целиком: пишем рядом и подменяем.
+        partial = f"{target_path}.{os.getpid()}.partial"
+        image.save(partial, image_format, **options)
+        os.replace(partial, target_path)
+        return image.width, image.height
+
+
+def has_alpha(image):
+    return image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    )
+
+
+def normalize_image(
+    source_path,
+    target_path,
+    image_format="JPEG",
+    quality=JPEG_QUALITY,
+    max_size=MAX_SIZE,
+):
+    """
+    Обработать загруженное фото: повернуть по EXIF, уменьшить
+    до max_size, сохранить без метаданных в image_format
+    (прозрачные фото для JPEG — в PNG). Возвращает формат, размеры
+    и нужна ли была обработка: фото уменьшено или в нём были метаданные.
+    """
+    with Image.open(source_path) as original:
+        had_metadata = bool(original.getexif()) or any(
+            key in original.info for key in METADATA_KEYS
+        )
+        image = ImageOps.exif_transpose(original)
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+        resized = image.size != original.size
+        if image_format in NO_ALPHA_FORMATS and has_alpha(image):
+            image_format = "PNG"
+        elif image_format in NO_ALPHA_FORMATS and image.mode != "RGB":
+            image = image.convert("RGB")
+        # Кодировщики берут метаданные из info: оставляем только прозрачность.
+        image.info = {
+            key: value
+            for key, value in image.info.items()
+            if key == "transparency"
+        }
+        options = dict(SAVE_OPTIONS.get(image_format, {}), exif=b"")
+        if image_format in ("JPEG", "WEBP"):
+            options["quality"] = quality
+        # Профиль цвета нужен для верных цветов, но только для того же
+        # цветового пространства: после CMYK → RGB он уже неверен.
+        icc_profile = original.info.get("icc_profile")
+        if icc_profile and image.mode == original.mode:
+            options["icc_profile"] = icc_profile
+        image.save(target_path, image_format, **options)
+        return image_format, image.width, image.height, resized or had_metadata
@@ -0,0 +1,132 @@
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+from .models import Category
+
+User = get_user_model()
+
+LOOKUP_CACHE_SIZE = 256
+LOOKUP_CACHE_TIMEOUT = 60
+STATS_LOG_EVERY = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """
+    Ограниченный кеш процесса: при переполнении вытесняется
+    давно не запрошенная запись. Записи живут не дольше timeout —
+    так ограничено устаревание в процессах, не получивших сигнал.
+    Кеш хранит и отдаёт копии объектов: потоки не делят экземпляры
+    моделей, и правка полученного объекта не меняет закешированный.
+    """
+
+    def __init__(self, name, maxsize, timeout):
+        self.name = name
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        value = None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                value = entry[1]
+            else:
+                self._data.pop(key, None)
+                self.misses += 1
+            lookups = self.hits + self.misses
+        if lookups % STATS_LOG_EVERY == 0:
+            logger.info("Кеш %s: %s", self.name, self.stats())
+        return None if value is None else copy.copy(value)
+
+    def set(self, key, value):
+        value = copy.copy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, pk):
+        """Убрать все записи объекта с первичным ключом pk."""
+        with self._lock:
+            for key, (_, value) in list(self._data.items()):
+                if value.pk == pk:
+                    del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+            }
+
+
+def make_cache(name):
+    return LRUCache(
+        name,
+        getattr(settings, "BLOG_LOOKUP_CACHE_SIZE", LOOKUP_CACHE_SIZE),
+        getattr(settings, "BLOG_LOOKUP_CACHE_TIMEOUT", LOOKUP_CACHE_TIMEOUT),
+    )
+
+
+category_cache = make_cache("категорий")
+user_cache = make_cache("пользователей")
+
+
+def cached_lookup(lru, model, **lookup):
+    """Объект из кеша процесса или из БД; 404, если его нет."""
+    key = tuple(lookup.values())
+    obj = lru.get(key)
+    if obj is None:
+        try:
+            obj = model.objects.get(**lookup)
+        except model.DoesNotExist:
+            raise Http404(f"{model._meta.verbose_name} не найден(а).")
+        lru.set(key, obj)
+    return obj
+
+
+def get_published_category(slug):
+    category = cached_lookup(category_cache, Category, slug=slug)
+    if not category.is_published:
+        raise Http404("Категория снята с публикации.")
+    return category
+
+
+def get_user_by_username(username):
+    return cached_lookup(user_cache, User, username=username)
+
+
+def lookup_cache_stats():
+    """Счётчики попаданий и промахов кешей процесса."""
+    return {
+        lru.name: lru.stats() for lru in (category_cache, user_cache)
+    }
+
+
+def clear_lookup_caches():
+    for lru in (category_cache, user_cache):
+        lru.clear()
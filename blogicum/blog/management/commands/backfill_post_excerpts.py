@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Post, make_excerpt
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Заполнить анонсы публикаций, сохранённых до появления анонсов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько публикаций обрабатывать за одну транзакцию.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Пересчитать анонсы всех публикаций, а не только пустые.",
+        )
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.only("id", "text", "excerpt").order_by("pk")
+        if not options["all"]:
+            queryset = queryset.filter(excerpt="")
+        updated = 0
+        last_pk = 0
+        while True:
+            posts = list(
+                queryset.filter(pk__gt=last_pk)[:options["chunk_size"]]
+            )
+            if not posts:
+                break
+            changed = []
+            for post in posts:
+                excerpt = make_excerpt(post.text)
+                if post.excerpt != excerpt:
+                    post.excerpt = excerpt
+                    changed.append(post)
+            with transaction.atomic():
+                Post.objects.bulk_update(changed, ["excerpt"])
+            updated += len(changed)
+            last_pk = posts[-1].pk
+        self.stdout.write(
+            self.style.SUCCESS(f"Обновлено анонсов: {updated}.")
+        )
@@ -0,0 +1,121 @@
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sqlite import apply_pragmas
+
+SECONDS = 5
+WRITERS = 4
+READERS = 4
+POSTS = 100
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    apply_pragmas(connection.cursor(), pragmas)
+    return connection
+
+
+class Benchmark:
+    """
+    Писатели добавляют комментарии, читатели выбирают комментарии
+    поста; считаются записи, чтения и ошибки блокировки.
+    """
+
+    def __init__(self, path, pragmas, seconds):
+        self.path = path
+        self.pragmas = pragmas
+        self.deadline = time.monotonic() + seconds
+        self.totals = {"writes": 0, "reads": 0, "locked": 0}
+        self.lock = threading.Lock()
+
+    def count(self, key):
+        with self.lock:
+            self.totals[key] += 1
+
+    def create_table(self):
+        connection = connect(self.path, self.pragmas)
+        connection.execute(
+            "CREATE TABLE comment (id INTEGER PRIMARY KEY, post_id INTEGER,"
+            " text TEXT, created_at REAL)"
+        )
+        connection.execute(
+            "CREATE INDEX comment_post ON comment (post_id, created_at)"
+        )
+        connection.commit()
+        connection.close()
+
+    def loop(self, operation):
+        connection = connect(self.path, self.pragmas)
+        i = 0
+        while time.monotonic() < self.deadline:
+            i += 1
+            try:
+                self.count(operation(connection, i))
+            except sqlite3.OperationalError:
+                connection.rollback()
+                self.count("locked")
+        connection.close()
+
+    @staticmethod
+    def write(connection, i):
+        connection.execute(
+            "INSERT INTO comment (post_id, text, created_at) VALUES (?, ?, ?)",
+            (i % POSTS, f"комментарий {i}", time.time()),
+        )
+        connection.commit()
+        return "writes"
+
+    @staticmethod
+    def read(connection, i):
+        connection.execute(
+            "SELECT id, text FROM comment WHERE post_id = ?"
+            " ORDER BY created_at LIMIT 20",
+            (i % POSTS,),
+        ).fetchall()
+        return "reads"
+
+    def run(self, writers, readers):
+        self.create_table()
+        threads = [
+            threading.Thread(target=self.loop, args=(operation,))
+            for operation in [self.write] * writers + [self.read] * readers
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return self.totals
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнить пропускную способность SQLite при конкурентных "
+        "чтении и записи без настроек и с SQLITE_PRAGMAS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=SECONDS)
+        parser.add_argument("--writers", type=int, default=WRITERS)
+        parser.add_argument("--readers", type=int, default=READERS)
+
+    def handle(self, *args, **options):
+        seconds = options["seconds"]
+        for label, pragmas in (
+            ("без настроек", {}),
+            ("SQLITE_PRAGMAS", getattr(settings, "SQLITE_PRAGMAS", {})),
+        ):
+            with tempfile.TemporaryDirectory() as directory:
+                totals = Benchmark(
+                    Path(directory) / "benchmark.sqlite3", pragmas, seconds
+                ).run(options["writers"], options["readers"])
+            self.stdout.write(
+                f"{label}: записей/с {totals['writes'] / seconds:.0f}, "
+                f"чтений/с {totals['reads'] / seconds:.0f}, "
+                f"ошибок блокировки {totals['locked']}"
+            )
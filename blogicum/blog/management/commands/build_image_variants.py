@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import build_variants, needs_variants
+from blog.models import Post
+
+CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = "Сделать недостающие копии фото публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько публикаций выбирать за один запрос.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Переделать копии и у публикаций, где они уже есть.",
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        last_pk = 0
+        while True:
+            posts = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .exclude(image="")
+                .order_by("pk")
+                .only("pk", "image", "image_variants")[:options["chunk_size"]]
+            )
+            if not posts:
+                break
+            for post in posts:
+                if options["all"] or needs_variants(post):
+                    build_variants(post.pk)
+                    built += 1
+            last_pk = posts[-1].pk
+        self.stdout.write(
+            self.style.SUCCESS(f"Копии фото сделаны для публикаций: {built}.")
+        )
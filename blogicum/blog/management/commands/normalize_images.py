@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import NormalizedImage, Post
+from blog.uploads import process_post_image
+
+CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = "Обработать фото публикаций, загруженные до их пережатия."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько публикаций выбирать за один запрос.",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        last_pk = 0
+        while True:
+            post_ids = list(
+                Post.objects.filter(pk__gt=last_pk)
+                .exclude(image="")
+                .exclude(image__in=NormalizedImage.objects.values("name"))
+                .order_by("pk")
+                .values_list("pk", flat=True)[:options["chunk_size"]]
+            )
+            if not post_ids:
+                break
+            for post_id in post_ids:
+                process_post_image(post_id)
+            processed += len(post_ids)
+            last_pk = post_ids[-1]
+        original_size, size = NormalizedImage.objects.savings()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработано фото: {processed}. Всего до обработки: "
+                f"{original_size} байт, после: {size} байт."
+            )
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import ArchiveMonth
+
+
+class Command(BaseCommand):
+    help = "Пересчитать число публикаций по месяцам для навигации архива."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            ArchiveMonth.objects.rebuild()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Месяцев в архиве: {ArchiveMonth.objects.count()}."
+            )
+        )
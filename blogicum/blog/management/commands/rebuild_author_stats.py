@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import AuthorStats
+
+CHUNK_SIZE = 1000
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Пересчитать число публикаций и подписчиков у всех авторов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько пользователей обрабатывать за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        checked = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                User.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:options["chunk_size"]]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                AuthorStats.objects.refresh_for(pks)
+            checked += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитана статистика авторов: {checked}.")
+        )
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.models import Category
+
+CHUNK_SIZE = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитать число публикаций и даты последней и ближайшей "
+        "отложенной публикации у категорий. Запускается периодически."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько категорий пересчитывать за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        checked = 0
+        last_pk = 0
+        while True:
+            pks = list(
+                Category.objects.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:options["chunk_size"]]
+            )
+            if not pks:
+                break
+            with transaction.atomic():
+                Category.objects.filter(pk__in=pks).refresh_post_stats()
+            checked += len(pks)
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(f"Пересчитано категорий: {checked}.")
+        )
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from blog.models import Post
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитать сохранённые счётчики комментариев у публикаций "
+        "и исправить расхождения."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько публикаций проверять за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            chunk = Post.objects.filter(pk__gt=last_pk).order_by("pk")
+            pks = list(chunk.values_list("pk", flat=True)[:chunk_size])
+            if not pks:
+                break
+            chunk = Post.objects.filter(pk__gt=last_pk, pk__lte=pks[-1])
+            with transaction.atomic():
+                drifted = list(
+                    chunk.with_actual_comment_count()
+                    .exclude(comment_count=F("actual_comment_count"))
+                    .values_list("pk", flat=True)
+                )
+                if drifted:
+                    Post.objects.filter(
+                        pk__in=drifted
+                    ).refresh_comment_count()
+            checked += len(pks)
+            fixed += len(drifted)
+            last_pk = pks[-1]
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Проверено публикаций: {checked}, исправлено: {fixed}."
+            )
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog.media import file_size
+from blog.models import MediaFile, Post
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Завести записи для загруженных фото и пересчитать ссылки на них."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько имён файлов обрабатывать за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        images = (
+            Post.objects.exclude(image="")
+            .order_by("image")
+            .values_list("image", flat=True)
+            .distinct()
+        )
+        last_name = ""
+        while True:
+            names = list(
+                images.filter(image__gt=last_name)[:options["chunk_size"]]
+            )
+            if not names:
+                break
+            with transaction.atomic():
+                MediaFile.objects.bulk_create(
+                    [
+                        MediaFile(name=name, size=file_size(name))
+                        for name in names
+                    ],
+                    ignore_conflicts=True,
+                )
+                MediaFile.objects.filter(
+                    name__in=names
+                ).refresh_ref_count()
+            last_name = names[-1]
+        with transaction.atomic():
+            MediaFile.objects.exclude(
+                name__in=Post.objects.values("image")
+            ).update(ref_count=0)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Учтено файлов: {MediaFile.objects.count()}."
+            )
+        )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+from blog.models import Post
+from blog.search import fts_available, rebuild_index
+
+CHUNK_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = "Перестроить полнотекстовый индекс публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Сколько публикаций обрабатывать за одну транзакцию.",
+        )
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            raise CommandError("Полнотекстовый индекс есть только в SQLite.")
+        last_id = Post.objects.aggregate(last=Max("pk"))["last"] or 0
+        chunk_size = options["chunk_size"]
+        for first_id in range(1, last_id + 1, chunk_size):
+            with transaction.atomic():
+                rebuild_index(first_id, first_id + chunk_size - 1)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Поисковый индекс перестроен до публикации {last_id}."
+            )
+        )
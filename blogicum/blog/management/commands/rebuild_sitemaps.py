@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.sitemaps import chunk_files, rebuild_sitemaps
+
+
+class Command(BaseCommand):
+    help = "Перестроить все файлы карты сайта и её индекс."
+
+    def handle(self, *args, **options):
+        rebuild_sitemaps()
+        self.stdout.write(
+            self.style.SUCCESS(f"Файлов карты сайта: {len(chunk_files())}.")
+        )
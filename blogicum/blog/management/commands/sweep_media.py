@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from blog.media import SWEEP_CHUNK_SIZE, sweep_media
+
+
+class Command(BaseCommand):
+    help = "Удалить загруженные файлы, на которые не ссылаются публикации."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=SWEEP_CHUNK_SIZE,
+            help="Сколько файлов проверять за один запрос.",
+        )
+        parser.add_argument(
+            "--grace-period",
+            type=int,
+            default=None,
+            help="Не трогать файлы моложе стольких секунд.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только посчитать, что было бы удалено.",
+        )
+
+    def handle(self, *args, **options):
+        files, reclaimed = sweep_media(
+            dry_run=options["dry_run"],
+            chunk_size=options["chunk_size"],
+            grace_period=options["grace_period"],
+        )
+        verb = "Можно удалить" if options["dry_run"] else "Удалено"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} файлов: {files}, освобождается байт: {reclaimed}."
+            )
+        )
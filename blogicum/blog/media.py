@@ -0,0 +1,326 @@
+import mimetypes
+import os
+import re
+import time
+from http import HTTPStatus
+from stat import S_ISREG
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .images import VARIANTS_DIR, variant_name, variant_source, variant_widths
+from .models import MediaFile, Post
+from .storage import INCOMING_DIR, content_digest
+from .tasks import run_in_background
+
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+MEDIA_MAX_AGE = 60 * 60
+ACCEL_PREFIX = "/protected-media/"
+SERVE_CHUNK_SIZE = 64 * 1024
+SWEEP_CHUNK_SIZE = 1000
+# Файл моложе этого мог быть загружен для ещё не сохранённого поста.
+SWEEP_GRACE_PERIOD = 60 * 60
+BYTE_RANGE = re.compile(r"^bytes=(?P<start>\d*)-(?P<end>\d*)$")
+
+
+def file_size(name):
+    try:
+        return default_storage.size(name)
+    except OSError:
+        return 0
+
+
+def acquire_media(name):
+    """Учесть ещё одну ссылку на файл, заведя его запись при первой."""
+    files = MediaFile.objects.filter(name=name)
+    if files.change_ref_count(1):
+        return
+    try:
+        with transaction.atomic():
+            MediaFile.objects.create(
+                name=name, size=file_size(name), ref_count=1
+            )
+    except IntegrityError:
+        files.change_ref_count(1)
+
+
+def release_media(name):
+    """Снять ссылку; файл без ссылок удаляется в фоне."""
+    if MediaFile.objects.filter(name=name).change_ref_count(-1):
+        run_in_background(delete_unreferenced, name, time.time())
+
+
+def delete_unreferenced(name, released_at):
+    """
+    Удалить файл и его копии, если на него так и не появилось ссылок.
+    Файлы без записи (загруженные до учёта ссылок) не трогаются.
+    Запись блокируется на время удаления, как и при повторной загрузке
+    того же содержимого; файл, загруженный заново после снятия ссылки,
+    остаётся: ссылку на него вот-вот учтут.
+    """
+    with transaction.atomic():
+        media = (
+            MediaFile.objects.select_for_update()
+            .filter(name=name, ref_count=0)
+            .first()
+        )
+        if media is None:
+            return
+        try:
+            if os.stat(default_storage.path(name)).st_mtime > released_at:
+                return
+        except FileNotFoundError:
+            pass
+        default_storage.delete(name)
+        for width in set(variant_widths().values()):
+            default_storage.delete(variant_name(name, width))
+        media.delete()
+
+
+def walk_media(directory):
+    """
+    Обойти каталог хранилища потоком: пары (имя, stat) выдаются
+    по мере чтения, в памяти только стек ещё не пройденных каталогов.
+    """
+    root = os.fspath(settings.MEDIA_ROOT)
+    stack = [os.path.join(root, directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    name = os.path.relpath(entry.path, root)
+                    yield (
+                        name.replace(os.sep, "/"),
+                        entry.stat(follow_symlinks=False),
+                    )
+
+
+def sweep_directories():
+    """Каталоги, в которых лежат только файлы, созданные хранилищем."""
+    upload_to = Post._meta.get_field("image").upload_to
+    return (upload_to, f"{VARIANTS_DIR}/{upload_to}", INCOMING_DIR)
+
+
+def walk_chunks(chunk_size):
+    chunk = []
+    for directory in sweep_directories():
+        for item in walk_media(directory):
+            chunk.append(item)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def find_orphans(chunk):
+    """
+    Файлы пачки, на которые не ссылается ни одна публикация. Множество
+    ссылок строится одним запросом только по именам этой пачки; копия
+    фото живёт, пока есть ссылки на её исходное фото.
+    """
+    sources = {name: variant_source(name) or name for name, _ in chunk}
+    referenced = set(
+        Post.objects.filter(image__in=set(sources.values())).values_list(
+            "image", flat=True
+        )
+    )
+    return [
+        (name, stat) for name, stat in chunk
+        if sources[name] not in referenced
+    ]
+
+
+def sweep_media(
+    dry_run=False, chunk_size=SWEEP_CHUNK_SIZE, grace_period=None
+):
+    """
+    Удалить файлы, на которые не ссылаются публикации: остатки загрузок
+    до учёта ссылок, оборванные загрузки и копии удалённых фото.
+    Вернуть число файлов и байт, которые удалены (или были бы удалены).
+    """
+    if grace_period is None:
+        grace_period = getattr(
+            settings, "BLOG_MEDIA_SWEEP_GRACE_PERIOD", SWEEP_GRACE_PERIOD
+        )
+    deadline = time.time() - grace_period
+    files = reclaimed = 0
+    for chunk in walk_chunks(chunk_size):
+        orphans = [
+            (name, stat) for name, stat in find_orphans(chunk)
+            if stat.st_mtime < deadline
+        ]
+        if not dry_run:
+            orphans = [
+                (name, stat) for name, stat in orphans
+                if delete_orphan(name, deadline)
+            ]
+            MediaFile.objects.filter(
+                name__in=[name for name, _ in orphans]
+            ).delete()
+        files += len(orphans)
+        reclaimed += sum(stat.st_size for _, stat in orphans)
+    return files, reclaimed
+
+
+def delete_orphan(name, deadline):
+    """Удалить файл, если его не загрузили заново после обхода."""
+    try:
+        if os.stat(default_storage.path(name)).st_mtime >= deadline:
+            return False
+    except FileNotFoundError:
+        return False
+    default_storage.delete(name)
+    return True
+
+
+def parse_range(header, size):
+    """
+    Один диапазон из заголовка Range: (начало, конец включительно).
+    None — отдать файл целиком (нет заголовка, несколько диапазонов
+    или непонятная единица), ValueError — диапазон вне файла.
+    """
+    match = BYTE_RANGE.match(header or "")
+    if match is None:
+        return None
+    start, end = match["start"], match["end"]
+    if start and end and int(end) < int(start):
+        # Синтаксически неверный диапазон игнорируется (RFC 9110).
+        return None
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    elif end:
+        start, end = max(size - int(end), 0), size - 1
+    else:
+        return None
+    if start > end or start >= size:
+        raise ValueError("Диапазон вне файла.")
+    return start, end
+
+
+def read_range(path, start, length, chunk_size=SERVE_CHUNK_SIZE):
+    with open(path, "rb") as media:
+        media.seek(start)
+        while length > 0:
+            chunk = media.read(min(chunk_size, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
+
+
+def media_etag(name, stat):
+    digest = content_digest(name)
+    if digest is not None:
+        return quote_etag(digest)
+    return quote_etag(f"{stat.st_mtime_ns:x}-{stat.st_size:x}")
+
+
+def media_cache_control(name):
+    """Файл по хешу содержимого не меняется никогда — кешируется навсегда."""
+    if content_digest(name) is not None:
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={MEDIA_MAX_AGE}"
+
+
+def accel_response(accel, name, full_path):
+    """
+    Ответ без тела: файл отдаёт фронтовой сервер по заголовку.
+    Для nginx это internal-location BLOG_MEDIA_ACCEL_PREFIX, который
+    смотрит в MEDIA_ROOT; Range и отдачу байт он берёт на себя.
+    """
+    response = HttpResponse()
+    if accel == "x-accel-redirect":
+        prefix = getattr(settings, "BLOG_MEDIA_ACCEL_PREFIX", ACCEL_PREFIX)
+        response["X-Accel-Redirect"] = prefix + quote(name)
+    else:
+        response["X-Sendfile"] = full_path
+    del response["Content-Type"]
+    return response
+
+
+def file_response(request, full_path, stat, etag):
+    """Отдать файл самим: для разработки, с поддержкой Range."""
+    size = stat.st_size
+    if_range = request.META.get("HTTP_IF_RANGE")
+    header = request.META.get("HTTP_RANGE")
+    if if_range and if_range not in (etag, http_date(stat.st_mtime)):
+        header = None
+    try:
+        byte_range = parse_range(header, size)
+    except ValueError:
+        response = HttpResponse(
+            status=HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    if byte_range is None:
+        response = FileResponse(open(full_path, "rb"))
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            read_range(full_path, start, end - start + 1),
+            status=HTTPStatus.PARTIAL_CONTENT,
+        )
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = end - start + 1
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
+def serve_media(request, path):
+    """
+    Отдать загруженный файл. С BLOG_MEDIA_ACCEL Django только проверяет
+    путь и условные заголовки, а байты отдаёт фронтовой сервер;
+    без него файл читается самим приложением, но только при DEBUG,
+    как django.conf.urls.static.
+    """
+    accel = getattr(settings, "BLOG_MEDIA_ACCEL", None)
+    if not accel and not settings.DEBUG:
+        raise Http404("Файл не найден.")
+    name = path.lstrip("/")
+    if not name or any(part.startswith(".") for part in name.split("/")):
+        raise Http404("Файл не найден.")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+        stat = os.stat(full_path)
+    except (OSError, SuspiciousFileOperation):
+        raise Http404("Файл не найден.")
+    if not S_ISREG(stat.st_mode):
+        raise Http404("Файл не найден.")
+    etag = media_etag(name, stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        if accel:
+            response = accel_response(accel, name, full_path)
+        else:
+            response = file_response(request, full_path, stat, etag)
+        content_type, encoding = mimetypes.guess_type(full_path)
+        response["Content-Type"] = content_type or "application/octet-stream"
+        if encoding:
+            response["Content-Encoding"] = encoding
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = media_cache_control(name)
+    return response
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-17 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0022_post_updated_at"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="post",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_index=True,
+                help_text=(
+                    "Обновляется и при изменении комментариев к публикации."
+                ),
+                verbose_name="Изменено",
+            ),
+        ),
+    ]
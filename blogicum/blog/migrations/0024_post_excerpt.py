@@ -0,0 +1,23 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0023_post_updated_at_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="excerpt",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                help_text="Начало текста для ленты; обновляется при сохранении.",
+                max_length=256,
+                verbose_name="Анонс",
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-17 04:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0024_post_excerpt"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "created_at", "id"],
+                name="comment_post_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:10
+
+from django.db import migrations
+
+SEARCH_TABLE = "blog_post_search"
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+        "title, text, tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # Совпадение в заголовке весит больше, чем в тексте.
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rank)"
+        " VALUES ('rank', 'bm25(10.0, 1.0)')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, text)"
+        " SELECT id, title, text FROM blog_post"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0025_comment_post_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
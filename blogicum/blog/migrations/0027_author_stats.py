@@ -0,0 +1,67 @@
+# Generated by Django 3.2.16 on 2026-10-17 05:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def fill_author_stats(apps, schema_editor):
+    AuthorStats = apps.get_model("blog", "AuthorStats")
+    Post = apps.get_model("blog", "Post")
+    AuthorStats.objects.bulk_create(
+        AuthorStats(author_id=row["author"], post_count=row["total"])
+        for row in Post.objects.order_by()
+        .values("author")
+        .annotate(total=Count("pk"))
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("blog", "0026_post_search"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="AuthorStats",
+            fields=[
+                (
+                    "author",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="post_stats",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Автор",
+                    ),
+                ),
+                (
+                    "post_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text=(
+                            "Все публикации автора, включая скрытые"
+                            " и отложенные."
+                        ),
+                        verbose_name="Количество публикаций",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "статистика автора",
+                "verbose_name_plural": "Статистика авторов",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("is_published", True)),
+                fields=["author", "-pub_date", "-id"],
+                name="post_published_author_idx",
+            ),
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
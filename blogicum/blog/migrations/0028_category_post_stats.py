@@ -0,0 +1,74 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:05
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+
+
+def fill_category_stats(apps, schema_editor):
+    Category = apps.get_model("blog", "Category")
+    Post = apps.get_model("blog", "Post")
+    published = Post.objects.filter(
+        category=OuterRef("pk"), is_published=True
+    ).order_by()
+    Category.objects.update(
+        post_count=Coalesce(
+            Subquery(
+                published.filter(pub_date__lte=Now())
+                .values("category")
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        ),
+        latest_pub_date=Subquery(
+            published.filter(pub_date__lte=Now())
+            .order_by("-pub_date")
+            .values("pub_date")[:1]
+        ),
+        next_pub_date=Subquery(
+            published.filter(pub_date__gt=Now())
+            .order_by("pub_date")
+            .values("pub_date")[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0027_author_stats"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="latest_pub_date",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Последняя публикация",
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="next_pub_date",
+            field=models.DateTimeField(
+                blank=True,
+                editable=False,
+                null=True,
+                verbose_name="Ближайшая отложенная публикация",
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="post_count",
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text="Опубликованные посты в ленте; ведётся автоматически.",
+                verbose_name="Количество публикаций",
+            ),
+        ),
+        migrations.RunPython(fill_category_stats, migrations.RunPython.noop),
+    ]
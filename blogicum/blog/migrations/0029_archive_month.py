@@ -0,0 +1,57 @@
+# Generated by Django 3.2.16 on 2026-10-17 06:30
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def fill_archive_months(apps, schema_editor):
+    ArchiveMonth = apps.get_model("blog", "ArchiveMonth")
+    Post = apps.get_model("blog", "Post")
+    totals = (
+        Post.objects.filter(is_published=True, category__is_published=True)
+        .order_by()
+        .annotate(
+            month=TruncMonth("pub_date", output_field=models.DateField())
+        )
+        .values("month")
+        .annotate(total=Count("pk"))
+    )
+    ArchiveMonth.objects.bulk_create(
+        ArchiveMonth(month=row["month"], post_count=row["total"])
+        for row in totals
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0028_category_post_stats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchiveMonth",
+            fields=[
+                (
+                    "month",
+                    models.DateField(
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="Месяц",
+                    ),
+                ),
+                (
+                    "post_count",
+                    models.PositiveIntegerField(
+                        verbose_name="Количество публикаций"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "месяц архива",
+                "verbose_name_plural": "Месяцы архива",
+                "ordering": ("-month",),
+            },
+        ),
+        migrations.RunPython(fill_archive_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 3.2.16 on 2026-10-17 08:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0031_post_image_variants"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MediaFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="Имя"
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        default=0, verbose_name="Размер, байт"
+                    ),
+                ),
+                (
+                    "ref_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text=(
+                            "Публикации с этим фото; ведётся автоматически."
+                        ),
+                        verbose_name="Количество ссылок",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Загружен"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "файл",
+                "verbose_name_plural": "Файлы",
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2.16 on 2026-10-17 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0032_media_file"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NormalizedImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "original",
+                    models.CharField(
+                        max_length=255,
+                        unique=True,
+                        verbose_name="Исходный файл",
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        db_index=True,
+                        max_length=255,
+                        verbose_name="Обработанный файл",
+                    ),
+                ),
+                (
+                    "original_size",
+                    models.PositiveBigIntegerField(
+                        verbose_name="Размер до, байт"
+                    ),
+                ),
+                (
+                    "size",
+                    models.PositiveBigIntegerField(
+                        verbose_name="Размер после, байт"
+                    ),
+                ),
+                (
+                    "width",
+                    models.PositiveIntegerField(verbose_name="Ширина"),
+                ),
+                (
+                    "height",
+                    models.PositiveIntegerField(verbose_name="Высота"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Обработан"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "обработанное фото",
+                "verbose_name_plural": "Обработанные фото",
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-17 11:20
+
+from django.db import migrations
+from django.utils.text import Truncator
+
+BATCH_SIZE = 1000
+# Копия blog.models.make_excerpt на момент миграции: правки модели
+# не должны менять то, что делает уже выпущенная миграция.
+EXCERPT_WORDS = 10
+EXCERPT_LENGTH = 256
+
+
+def make_excerpt(text):
+    """Краткий текст для карточки публикации."""
+    return Truncator(Truncator(text).words(EXCERPT_WORDS)).chars(
+        EXCERPT_LENGTH
+    )
+
+
+def backfill_excerpts(apps, schema_editor):
+    """Заполнить анонсы постов, сохранённых до их появления, пачками."""
+    Post = apps.get_model("blog", "Post")
+    posts = (
+        Post.objects.using(schema_editor.connection.alias)
+        .filter(excerpt="")
+        .only("id", "text", "excerpt")
+        .order_by("pk")
+    )
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk)[:BATCH_SIZE])
+        if not batch:
+            return
+        for post in batch:
+            post.excerpt = make_excerpt(post.text)
+        Post.objects.using(schema_editor.connection.alias).bulk_update(
+            batch, ["excerpt"]
+        )
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0033_normalized_image"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_excerpts, migrations.RunPython.noop),
+    ]
@@ -1,14 +1,121 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db.models import Count
-from django.shortcuts import redirect
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Max
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect
+from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
+from django.utils.safestring import mark_safe
 from django.views.generic import ListView
 
+from .caching import (
+    page_cache_key,
+    page_cache_timeout,
+    page_etag,
+    prefetch_post_cards,
+    render_post_card,
+)
 from .models import Comment, Post
+from .paginators import CursorPaginator, FeedPaginator, InvalidCursor
 
 User = get_user_model()
 
 
+def latest(*moments):
+    """Самый поздний из моментов времени, пропуская пустые."""
+    moments = [moment for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+class ConditionalGetMixin:
+    """
+    Отдаёт Last-Modified и ETag, а на повторный запрос
+    с теми же валидаторами отвечает 304 без отрисовки шаблона.
+    Представление задаёт get_last_modified() и, если нужно,
+    get_etag_extra(); ставится в MRO перед AnonymousPageCacheMixin.
+    """
+
+    def get_etag_extra(self):
+        """Состояние страницы, которого нет в дате её изменения."""
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return super().dispatch(request, *args, **kwargs)
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return super().dispatch(request, *args, **kwargs)
+        etag = quote_etag(
+            page_etag(request, last_modified, *self.get_etag_extra())
+        )
+        timestamp = int(last_modified.timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            response["Last-Modified"] = http_date(timestamp)
+        return response
+
+
+def stream_and_store(content, response, store):
+    """
+    Отдать поток как есть, а дошедший до конца сохранить в кеш
+    обычным ответом с теми же заголовками. Оборванный клиентом
+    поток не сохраняется.
+    """
+    chunks = []
+    for chunk in content:
+        chunks.append(chunk)
+        yield chunk
+    stored = HttpResponse(b"".join(chunks), status=response.status_code)
+    for header, value in response.items():
+        stored[header] = value
+    store(stored)
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кеширует страницу целиком для анонимных GET-запросов.
+    Авторизованным кеш не отдаётся: в шапке выводится их имя.
+    Потоковая страница сохраняется, когда поток отдан до конца.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            request.method not in ("GET", "HEAD")
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request)
+        response = cache.get(key)
+        if response is not None:
+            return response
+        response = super().dispatch(request, *args, **kwargs)
+        if request.method != "GET" or response.status_code != 200:
+            return response
+
+        def store(rendered):
+            cache.set(key, rendered, page_cache_timeout())
+
+        if hasattr(response, "add_post_render_callback"):
+            response.add_post_render_callback(store)
+        elif response.streaming:
+            response.streaming_content = stream_and_store(
+                response.streaming_content, response, store
+            )
+        else:
+            store(response)
+        return response
+
+
 class PostListsMixin(ListView):
     """
     Вспомогательный CBV:
@@ -18,44 +125,169 @@ class PostListsMixin(ListView):
 
     model = Post
     paginate_by = 10
+    paginator_class = FeedPaginator
+    prefetch_cards = True
+    cursor_kwarg = "cursor"
 
     def get_queryset(self, *args, **kwargs):
         """Получить список постов в соотв-ии с авторм/местом/категорией."""
         return (
-            Post.objects.select_related("author", "category", "location")
-            .filter(
-                is_published=True,
-                pub_date__lte=timezone.now(),
-                category__is_published=True,
+            Post.objects.for_cards()
+            .published()
+            .order_by("-pub_date", "-id")
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Первые страницы ленты отдать по номеру,
+        дальше листать курсором по (pub_date, id) без OFFSET.
+        """
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if cursor is None:
+            paginator, page, object_list, is_paginated = (
+                super().paginate_queryset(queryset, page_size)
             )
-            .order_by("-pub_date")
-            .annotate(comment_count=Count("comments"))
+            if (
+                page.number >= paginator.page_number_limit
+                and page.has_next()
+            ):
+                page.next_cursor = CursorPaginator(
+                    queryset, page_size
+                ).cursor_for(page[-1])
+            return paginator, page, page.object_list, is_paginated
+        paginator = CursorPaginator(queryset, page_size)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise Http404("Некорректный курсор.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.prefetch_cards:
+            prefetch_post_cards(context["page_obj"])
+        return context
+
+    def get_last_modified(self):
+        """
+        Самая свежая из дат: появления публикации в ленте
+        и правки любой публикации или комментария к ней.
+        Глобальный максимум берётся по индексу за один шаг.
+        """
+        newest = (
+            self.get_queryset()
+            .filter(pub_date__lte=timezone.now())
+            .values_list("pub_date", flat=True)
+            .first()
+        )
+        return latest(
+            newest,
+            Post.objects.aggregate(latest=Max("updated_at"))["latest"],
         )
 
 
-class PostRedactMixin():
-    model = Post
-    template_name = "blog/create.html"
-    pk_url_kwarg = "post_id"
+class StreamingFeedMixin:
+    """
+    Потоковая отдача ленты при BLOG_STREAMING_FEEDS = True:
+    сначала уходит начало страницы с <head> и шапкой, и только потом
+    выбираются и по одной отрисовываются карточки публикаций,
+    за ними — переключатель страниц и остаток страницы.
+    Ставится в MRO перед PostListsMixin.
+    """
 
-    def dispatch(self, request, *args, **kwargs):
-        """Проверить, является ли пользователь из запроса автором поста.
-        Если нет-перенаправление на стр поста.
+    stream_marker = "<!-- post-cards -->"
+
+    @cached_property
+    def is_streaming(self):
+        return getattr(settings, "BLOG_STREAMING_FEEDS", False)
+
+    @property
+    def prefetch_cards(self):
         """
-        if self.get_object().author != self.request.user:
-            return redirect("blog:post_detail", post_id=kwargs["post_id"])
-        return super().dispatch(request, args, **kwargs)
+        При потоке карточки выбираются уже после отправки шапки.
+        Под ASGI Django перебирает поток в цикле событий, где ORM
+        недоступна, поэтому там страница выбирается заранее.
+        """
+        return not self.is_streaming or isinstance(self.request, ASGIRequest)
 
+    def render_to_response(self, context, **response_kwargs):
+        if not self.is_streaming:
+            return super().render_to_response(context, **response_kwargs)
+        context["stream_marker"] = mark_safe(self.stream_marker)
+        head, tail = render_to_string(
+            self.get_template_names(), context, request=self.request
+        ).split(self.stream_marker, 1)
+
+        def stream():
+            yield head
+            posts = list(context["page_obj"])
+            if not self.prefetch_cards:
+                prefetch_post_cards(posts)
+            for post in posts:
+                card = render_post_card(post)
+                yield f'<article class="mb-5">{card}</article>'
+            yield render_to_string(
+                "includes/paginator.html", context, request=self.request
+            )
+            yield tail
+
+        response_kwargs.setdefault("content_type", self.content_type)
+        return StreamingHttpResponse(stream(), **response_kwargs)
+
+
+class VisiblePostMixin:
+    """Пост из URL: автору — любой, остальным — только опубликованный."""
+
+    @cached_property
+    def requested_post(self):
+        """Пост вместе с автором, категорией и местом одним запросом."""
+        return get_object_or_404(
+            Post.objects.select_related("author", "category", "location"),
+            pk=self.kwargs["post_id"],
+        )
+
+    def get_visible_post(self):
+        post = self.requested_post
+        if post.author_id != self.request.user.pk and (
+            not post.is_published
+            or post.pub_date > timezone.now()
+            or (post.category is not None and not post.category.is_published)
+        ):
+            raise Http404()
+        return post
 
-class CommentRedactMixin():
-    model = Comment
-    template_name = "blog/comment.html"
-    pk_url_kwarg = "comment_id"
+
+class AuthorRedactMixin:
+    """
+    Пускает к правке и удалению объекта только его автора.
+    Объект выбирается один раз за запрос и переиспользуется
+    проверкой доступа и UpdateView/DeleteView; автор сравнивается
+    по author_id, без загрузки пользователя.
+    """
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_redacted_object"):
+            self._redacted_object = super().get_object()
+        return self._redacted_object
 
     def dispatch(self, request, *args, **kwargs):
-        """Проверить, является ли польз-ль из запроса автором коммента.
+        """Проверить, является ли пользователь из запроса автором.
         Если нет - перенаправить на страницу деталей поста.
         """
-        if self.get_object().author != self.request.user:
+        if self.get_object().author_id != self.request.user.pk:
             return redirect("blog:post_detail", post_id=kwargs["post_id"])
-        return super().dispatch(request, args, **kwargs)
+        return super().dispatch(request, *args, **kwargs)
+
+
+class PostRedactMixin(AuthorRedactMixin):
+    model = Post
+    template_name = "blog/create.html"
+    pk_url_kwarg = "post_id"
+
+
+class CommentRedactMixin(AuthorRedactMixin):
+    model = Comment
+    template_name = "blog/comment.html"
+    pk_url_kwarg = "comment_id"
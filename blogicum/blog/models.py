@@ -1,10 +1,42 @@
+from datetime import datetime, time, timedelta
+
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, Greatest, Now, TruncMonth
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import Truncator
 
 User = get_user_model()
 
 SHOW_SYMBOLS = 30
+EXCERPT_WORDS = 10
+EXCERPT_LENGTH = 256
+CARD_FIELDS = (
+    "id",
+    "title",
+    "excerpt",
+    "image",
+    "image_variants",
+    "pub_date",
+    "is_published",
+    "updated_at",
+    "comment_count",
+    "author__username",
+    "category__title",
+    "category__slug",
+    "category__is_published",
+    "location__name",
+    "location__is_published",
+)
+
+
+def make_excerpt(text):
+    """Краткий текст для карточки публикации."""
+    return Truncator(Truncator(text).words(EXCERPT_WORDS)).chars(
+        EXCERPT_LENGTH
+    )
 
 
 class PostCreationModel(models.Model):
@@ -21,6 +53,88 @@ class PostCreationModel(models.Model):
         abstract = True
 
 
+def published_in_category():
+    """Опубликованные посты категории из внешнего запроса."""
+    return Post.objects.filter(
+        category=OuterRef("pk"), is_published=True
+    ).order_by()
+
+
+def category_post_count():
+    """Подзапрос с числом видимых в ленте публикаций категории."""
+    return Coalesce(
+        Subquery(
+            published_in_category()
+            .filter(pub_date__lte=Now())
+            .values("category")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def category_latest_pub_date():
+    """Подзапрос с датой самой свежей видимой публикации категории."""
+    return Subquery(
+        published_in_category()
+        .filter(pub_date__lte=Now())
+        .order_by("-pub_date")
+        .values("pub_date")[:1]
+    )
+
+
+def category_next_pub_date():
+    """Подзапрос с датой ближайшей отложенной публикации категории."""
+    return Subquery(
+        published_in_category()
+        .filter(pub_date__gt=Now())
+        .order_by("pub_date")
+        .values("pub_date")[:1]
+    )
+
+
+class CategoryQuerySet(models.QuerySet):
+    """Запросы к категориям."""
+
+    def refresh_post_stats(self):
+        """Пересчитать число публикаций и даты одним UPDATE."""
+        return self.update(
+            post_count=category_post_count(),
+            latest_pub_date=category_latest_pub_date(),
+            next_pub_date=category_next_pub_date(),
+        )
+
+    def change_post_count(self, delta):
+        """
+        Сдвинуть число публикаций на delta и обновить даты:
+        обе берутся по индексу одной строкой.
+        """
+        return self.update(
+            post_count=Greatest(F("post_count") + delta, 0),
+            latest_pub_date=category_latest_pub_date(),
+            next_pub_date=category_next_pub_date(),
+        )
+
+    def with_current_stats(self):
+        """
+        Категории списком с актуальной статистикой. Вышедшие отложенные
+        публикации не сохраняются в момент выхода, поэтому категории,
+        где такие были, пересчитываются при чтении.
+        """
+        categories = list(self)
+        now = timezone.now()
+        due = [
+            category.pk
+            for category in categories
+            if category.next_pub_date and category.next_pub_date <= now
+        ]
+        if due:
+            self.model.objects.filter(pk__in=due).refresh_post_stats()
+            categories = list(self.all())
+        return categories
+
+
 class Category(PostCreationModel):
     """Модель тематической категории постов."""
 
@@ -35,6 +149,26 @@ class Category(PostCreationModel):
             "разрешены символы латиницы, цифры, дефис и подчёркивание."
         ),
     )
+    post_count = models.PositiveIntegerField(
+        "Количество публикаций",
+        default=0,
+        editable=False,
+        help_text="Опубликованные посты в ленте; ведётся автоматически.",
+    )
+    latest_pub_date = models.DateTimeField(
+        "Последняя публикация",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    next_pub_date = models.DateTimeField(
+        "Ближайшая отложенная публикация",
+        null=True,
+        blank=True,
+        editable=False,
+    )
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         verbose_name = "категория"
@@ -57,6 +191,52 @@ class Location(PostCreationModel):
         return self.name[:SHOW_SYMBOLS]
 
 
+def published_comment_count():
+    """Подзапрос с числом опубликованных комментариев к публикации."""
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef("pk"), is_published=True)
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    """Запросы к публикациям."""
+
+    def for_cards(self):
+        """Только то, что выводит карточка публикации в ленте."""
+        return self.select_related("author", "category", "location").only(
+            *CARD_FIELDS
+        )
+
+    def published(self):
+        """Посты, видимые в лентах: опубликованные и вышедшие."""
+        return self.filter(
+            is_published=True,
+            pub_date__lte=timezone.now(),
+            category__is_published=True,
+        )
+
+    def with_actual_comment_count(self):
+        """Добавить к публикациям фактическое число комментов."""
+        return self.annotate(actual_comment_count=published_comment_count())
+
+    def refresh_comment_count(self):
+        """Пересчитать сохранённый счётчик комментариев одним UPDATE."""
+        return self.update(comment_count=published_comment_count())
+
+    def change_comment_count(self, delta):
+        """Атомарно сдвинуть счётчик комментариев на delta."""
+        return self.update(
+            comment_count=Greatest(F("comment_count") + delta, 0)
+        )
+
+
 class Post(PostCreationModel):
     """Модель отдельной публикации."""
 
@@ -69,6 +249,13 @@ class Post(PostCreationModel):
     image = models.ImageField("Фото", upload_to="birthdays_images", blank=True)
     title = models.CharField("Заголовок", max_length=256)
     text = models.TextField("Текст")
+    excerpt = models.CharField(
+        "Анонс",
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        help_text="Начало текста для ленты; обновляется при сохранении.",
+    )
     pub_date = models.DateTimeField(
         "Дата и время публикации",
         help_text=(
@@ -90,10 +277,64 @@ class Post(PostCreationModel):
         related_name="posts",
         verbose_name="Категория",
     )
+    updated_at = models.DateTimeField(
+        "Изменено",
+        auto_now=True,
+        db_index=True,
+        help_text="Обновляется и при изменении комментариев к публикации.",
+    )
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+        help_text="Число опубликованных комментариев; ведётся автоматически.",
+    )
+    image_variants = models.JSONField(
+        "Копии фото",
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text=(
+            "Уменьшенные копии фото с их размерами; делаются в фоне "
+            "после загрузки."
+        ),
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
+        indexes = (
+            models.Index(
+                fields=("is_published", "-pub_date", "-id"),
+                name="post_feed_idx",
+            ),
+            models.Index(
+                fields=("category", "is_published", "-pub_date", "-id"),
+                name="post_category_feed_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                name="post_author_feed_idx",
+            ),
+            # Частичные индексы создаются только там, где их поддерживает БД.
+            models.Index(
+                fields=("-pub_date", "-id"),
+                condition=Q(is_published=True),
+                name="post_published_feed_idx",
+            ),
+            models.Index(
+                fields=("category", "-pub_date", "-id"),
+                condition=Q(is_published=True),
+                name="post_published_category_idx",
+            ),
+            models.Index(
+                fields=("author", "-pub_date", "-id"),
+                condition=Q(is_published=True),
+                name="post_published_author_idx",
+            ),
+        )
 
     def __str__(self):
         return self.title[:SHOW_SYMBOLS]
@@ -101,6 +342,107 @@ class Post(PostCreationModel):
     def get_absolute_url(self):
         return reverse("blog:post_detail", kwargs={"post_id": self.pk})
 
+    def save(self, *args, **kwargs):
+        """Обновить анонс, если сохраняется текст публикации."""
+        update_fields = kwargs.get("update_fields")
+        if "text" not in self.get_deferred_fields() and (
+            update_fields is None or "text" in update_fields
+        ):
+            self.excerpt = make_excerpt(self.text)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt"}
+        super().save(*args, **kwargs)
+
+
+def authored_post_count():
+    """Подзапрос с числом всех публикаций автора."""
+    return Coalesce(
+        Subquery(
+            Post.objects.filter(author=OuterRef("author"))
+            .order_by()
+            .values("author")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def author_follower_count():
+    """Подзапрос с числом подписчиков автора."""
+    return Coalesce(
+        Subquery(
+            Follow.objects.filter(author=OuterRef("author"))
+            .order_by()
+            .values("author")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class AuthorStatsQuerySet(models.QuerySet):
+    """Запросы к статистике авторов."""
+
+    def refresh_post_count(self):
+        """Пересчитать сохранённое число публикаций одним UPDATE."""
+        return self.update(post_count=authored_post_count())
+
+    def change_post_count(self, delta):
+        """Атомарно сдвинуть число публикаций на delta."""
+        return self.update(post_count=Greatest(F("post_count") + delta, 0))
+
+    def change_follower_count(self, delta):
+        """Атомарно сдвинуть число подписчиков на delta."""
+        return self.update(
+            follower_count=Greatest(F("follower_count") + delta, 0)
+        )
+
+    def refresh_for(self, author_ids):
+        """Завести недостающую статистику авторов и пересчитать её."""
+        author_ids = {pk for pk in author_ids if pk is not None}
+        self.bulk_create(
+            [self.model(author_id=pk) for pk in author_ids],
+            ignore_conflicts=True,
+        )
+        return self.filter(author_id__in=author_ids).update(
+            post_count=authored_post_count(),
+            follower_count=author_follower_count(),
+        )
+
+
+class AuthorStats(models.Model):
+    """
+    Заранее посчитанное число публикаций автора: страница профиля
+    листается без COUNT(*) по всем его публикациям.
+    """
+
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_stats",
+        verbose_name="Автор",
+    )
+    post_count = models.PositiveIntegerField(
+        "Количество публикаций",
+        default=0,
+        help_text="Все публикации автора, включая скрытые и отложенные.",
+    )
+    follower_count = models.PositiveIntegerField(
+        "Количество подписчиков", default=0
+    )
+
+    objects = AuthorStatsQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "статистика автора"
+        verbose_name_plural = "Статистика авторов"
+
+    def __str__(self):
+        return f"{self.author}: {self.post_count}"
+
 
 class Comment(PostCreationModel):
     """Модель комментария."""
@@ -123,9 +465,269 @@ class Comment(PostCreationModel):
         ordering = ("created_at",)
         verbose_name = "комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = (
+            models.Index(
+                fields=("post", "created_at", "id"),
+                name="comment_post_created_idx",
+            ),
+        )
 
     def __str__(self):
         return self.text[:SHOW_SYMBOLS]
 
     def get_absolute_url(self):
         return reverse("blog:post_detail", kwargs={"post_id": self.post.pk})
+
+
+def month_start(moment):
+    """Первый день месяца момента времени в текущем часовом поясе."""
+    return timezone.localtime(moment).date().replace(day=1)
+
+
+def month_range(month):
+    """Границы месяца [начало, начало следующего) как aware datetime."""
+    following = (month + timedelta(days=32)).replace(day=1)
+    return tuple(
+        timezone.make_aware(datetime.combine(day, time.min))
+        for day in (month, following)
+    )
+
+
+def archived_posts():
+    """Публикации, которые попадают в архив."""
+    return Post.objects.filter(
+        is_published=True, category__is_published=True
+    ).order_by()
+
+
+class ArchiveMonthQuerySet(models.QuerySet):
+    """Запросы к счётчикам архива по месяцам."""
+
+    def recount(self, months):
+        """Пересчитать месяцы по индексу на pub_date, диапазоном."""
+        for month in {month for month in months if month is not None}:
+            start, end = month_range(month)
+            total = archived_posts().filter(
+                pub_date__gte=start, pub_date__lt=end
+            ).count()
+            if total:
+                self.update_or_create(
+                    month=month, defaults={"post_count": total}
+                )
+            else:
+                self.filter(month=month).delete()
+
+    def rebuild(self):
+        """Пересчитать весь архив одним GROUP BY."""
+        totals = (
+            archived_posts()
+            .annotate(
+                month=TruncMonth("pub_date", output_field=models.DateField())
+            )
+            .values("month")
+            .annotate(total=Count("pk"))
+        )
+        self.all().delete()
+        self.bulk_create(
+            self.model(month=row["month"], post_count=row["total"])
+            for row in totals
+        )
+
+    def navigation(self):
+        """
+        Месяцы архива для навигации: прошедшие — из таблицы,
+        текущий — подсчётом по индексу, так как в нём могут
+        быть ещё не вышедшие отложенные публикации.
+        """
+        now = timezone.now()
+        current = month_start(now)
+        months = list(self.filter(month__lt=current).order_by("-month"))
+        total = archived_posts().filter(
+            pub_date__gte=month_range(current)[0], pub_date__lte=now
+        ).count()
+        if total:
+            months.insert(0, self.model(month=current, post_count=total))
+        return months
+
+
+class ArchiveMonth(models.Model):
+    """
+    Число публикаций за месяц для навигации по архиву,
+    включая отложенные; ведётся сигналами при правке публикаций.
+    """
+
+    month = models.DateField("Месяц", primary_key=True)
+    post_count = models.PositiveIntegerField("Количество публикаций")
+
+    objects = ArchiveMonthQuerySet.as_manager()
+
+    class Meta:
+        ordering = ("-month",)
+        verbose_name = "месяц архива"
+        verbose_name_plural = "Месяцы архива"
+
+    def __str__(self):
+        return f"{self.month:%m.%Y}: {self.post_count}"
+
+    def get_absolute_url(self):
+        return reverse(
+            "blog:archive_month",
+            kwargs={"year": self.month.year, "month": self.month.month},
+        )
+
+
+class Follow(models.Model):
+    """Подписка пользователя на публикации автора."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="following",
+        verbose_name="Подписчик",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="followers",
+        verbose_name="Автор",
+    )
+    created_at = models.DateTimeField("Добавлено", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "подписка"
+        verbose_name_plural = "Подписки"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "author"), name="follow_unique"
+            ),
+            models.CheckConstraint(
+                check=~Q(user=F("author")), name="follow_not_self"
+            ),
+        )
+        indexes = (
+            models.Index(fields=("author", "user"), name="follow_author_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.user} → {self.author}"
+
+
+class TimelineEntry(models.Model):
+    """
+    Строка личной ленты подписчика: пост автора, на которого он подписан.
+    Заполняется фоном при публикации поста (fan-out on write),
+    лента читается по индексу (user, -pub_date, -post).
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="timeline",
+        verbose_name="Читатель",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name="timeline_entries",
+        verbose_name="Публикация",
+    )
+    pub_date = models.DateTimeField("Дата и время публикации")
+
+    class Meta:
+        verbose_name = "запись ленты"
+        verbose_name_plural = "Записи лент"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "post"), name="timeline_unique"
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=("user", "-pub_date", "-post"),
+                name="timeline_user_feed_idx",
+            ),
+        )
+
+
+def media_ref_count():
+    return Coalesce(
+        Subquery(
+            Post.objects.filter(image=OuterRef("name"))
+            .order_by()
+            .values("image")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class MediaFileQuerySet(models.QuerySet):
+    """Запросы к файлам хранилища."""
+
+    def change_ref_count(self, delta):
+        return self.update(ref_count=Greatest(F("ref_count") + delta, 0))
+
+    def refresh_ref_count(self):
+        """Пересчитать ссылки из публикаций одним UPDATE."""
+        return self.update(ref_count=media_ref_count())
+
+
+class MediaFile(models.Model):
+    """
+    Файл хранилища по хешу содержимого. Одинаковые загрузки хранятся
+    один раз; файл удаляется, когда на него не остаётся ссылок.
+    """
+
+    name = models.CharField("Имя", max_length=255, unique=True)
+    size = models.PositiveBigIntegerField("Размер, байт", default=0)
+    ref_count = models.PositiveIntegerField(
+        "Количество ссылок",
+        default=0,
+        help_text="Публикации с этим фото; ведётся автоматически.",
+    )
+    created_at = models.DateTimeField("Загружен", auto_now_add=True)
+
+    objects = MediaFileQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "файл"
+        verbose_name_plural = "Файлы"
+
+
+class NormalizedImageQuerySet(models.QuerySet):
+    """Запросы к результатам обработки фото."""
+
+    def for_name(self, name):
+        """Обработка, из которой получен файл или которая из него сделана."""
+        return self.filter(Q(original=name) | Q(name=name))
+
+    def savings(self):
+        """Суммарный размер фото до и после обработки, в байтах."""
+        totals = self.aggregate(
+            original_size=Coalesce(Sum("original_size"), 0),
+            size=Coalesce(Sum("size"), 0),
+        )
+        return totals["original_size"], totals["size"]
+
+
+class NormalizedImage(models.Model):
+    """
+    Загруженное фото и его обработанная копия: без метаданных,
+    не больше предельных размеров, пережатая. Размеры до и после
+    показывают, сколько байт экономит обработка.
+    """
+
+    original = models.CharField("Исходный файл", max_length=255, unique=True)
+    name = models.CharField("Обработанный файл", max_length=255, db_index=True)
+    original_size = models.PositiveBigIntegerField("Размер до, байт")
+    size = models.PositiveBigIntegerField("Размер после, байт")
+    width = models.PositiveIntegerField("Ширина")
+    height = models.PositiveIntegerField("Высота")
+    created_at = models.DateTimeField("Обработан", auto_now_add=True)
+
+    objects = NormalizedImageQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "обработанное фото"
+        verbose_name_plural = "Обработанные фото"
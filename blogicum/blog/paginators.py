@@ -0,0 +1,192 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import DateTimeField, Q
+from django.utils.dateparse import parse_datetime
+
+PAGE_NUMBER_LIMIT = 5
+
+
+class InvalidCursor(InvalidPage):
+    """Курсор не удалось разобрать."""
+
+
+def encode_cursor(direction, values):
+    """Упаковать направление и значения ключа в непрозрачную строку."""
+    payload = json.dumps(
+        [direction] + [
+            value.isoformat() if hasattr(value, "isoformat") else value
+            for value in values
+        ],
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Распаковать курсор, полученный из encode_cursor."""
+    try:
+        padding = "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+        direction, *values = payload
+    except (TypeError, ValueError):
+        raise InvalidCursor("Некорректный курсор.")
+    if direction not in ("n", "p"):
+        raise InvalidCursor("Некорректный курсор.")
+    return direction, values
+
+
+class FeedPaginator(Paginator):
+    """
+    Постраничный пагинатор для первых страниц ленты.
+    Номера страниц показываются только до page_number_limit,
+    дальше лента листается курсором.
+    """
+
+    page_number_limit = PAGE_NUMBER_LIMIT
+
+    def __init__(self, *args, count=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if count is not None:
+            # Заранее посчитанное число объектов вместо COUNT(*).
+            self.count = count
+
+    @property
+    def page_range(self):
+        return range(1, min(self.num_pages, self.page_number_limit) + 1)
+
+    @property
+    def shows_last_page(self):
+        return self.num_pages <= self.page_number_limit
+
+
+class CursorPage:
+    """Страница keyset-пагинации с совместимым со стандартным Page API."""
+
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинация по (pub_date, id) вместо OFFSET:
+    каждая страница выбирается по индексу от ключа последнего объекта,
+    поэтому стоимость запроса не зависит от глубины страницы.
+    """
+
+    key_fields = ("pub_date", "id")
+    descending = True
+
+    def __init__(self, queryset, per_page, key_fields=None, descending=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        if key_fields is not None:
+            self.key_fields = key_fields
+        if descending is not None:
+            self.descending = descending
+
+    def cursor_for(self, obj, direction="n"):
+        """Курсор на страницу после (n) или перед (p) объектом."""
+        return encode_cursor(
+            direction, [getattr(obj, field) for field in self.key_fields]
+        )
+
+    def _parse_value(self, field, value):
+        """Значение ключа из курсора или None, если оно некорректно."""
+        try:
+            model_field = self.queryset.model._meta.get_field(field)
+        except FieldDoesNotExist:
+            # Аннотация, например rank полнотекстового поиска.
+            model_field = None
+        if isinstance(model_field, DateTimeField):
+            try:
+                return parse_datetime(value)
+            except (TypeError, ValueError):
+                return None
+        numbers = int if model_field is not None else (int, float)
+        if isinstance(value, bool) or not isinstance(value, numbers):
+            return None
+        return value
+
+    def _parse_values(self, values):
+        if len(values) != len(self.key_fields):
+            raise InvalidCursor("Некорректный курсор.")
+        parsed = [
+            self._parse_value(field, value)
+            for field, value in zip(self.key_fields, values)
+        ]
+        if None in parsed:
+            raise InvalidCursor("Некорректный курсор.")
+        return parsed
+
+    def _seek(self, values, greater):
+        """Условие «строго больше (меньше) ключа» для составного ключа."""
+        lookup = "gt" if greater else "lt"
+        condition = Q()
+        for i, field in enumerate(self.key_fields):
+            step = Q(**{f"{field}__{lookup}": values[i]})
+            for prev_field, prev_value in zip(self.key_fields[:i], values[:i]):
+                step &= Q(**{prev_field: prev_value})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        """Страница по курсору; без курсора — первая страница."""
+        backwards = False
+        queryset = self.queryset
+        if cursor is not None:
+            direction, values = decode_cursor(cursor)
+            backwards = direction == "p"
+            queryset = queryset.filter(
+                self._seek(
+                    self._parse_values(values), backwards == self.descending
+                )
+            )
+        ascending = backwards == self.descending
+        ordering = [
+            field if ascending else f"-{field}" for field in self.key_fields
+        ]
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        if not rows:
+            return CursorPage(rows, self, None, None)
+        next_cursor = self.cursor_for(rows[-1])
+        previous_cursor = self.cursor_for(rows[0], "p")
+        if backwards and not has_more:
+            previous_cursor = None
+        if not backwards and not has_more:
+            next_cursor = None
+        if cursor is None:
+            previous_cursor = None
+        return CursorPage(rows, self, next_cursor, previous_cursor)
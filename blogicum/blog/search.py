@@ -0,0 +1,90 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+SEARCH_TABLE = "blog_post_search"
+SEARCH_MAX_WORDS = 10
+SEARCH_WORD = re.compile(r"\w+")
+
+MATCHING_IDS = (
+    f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+)
+MATCH_RANK = (
+    f"SELECT rank FROM {SEARCH_TABLE}"
+    f' WHERE {SEARCH_TABLE} MATCH %s AND rowid = "blog_post"."id"'
+)
+
+
+def fts_available(using=connection):
+    return using.vendor == "sqlite"
+
+
+def match_expression(query):
+    """
+    Запрос пользователя в выражение FTS5: каждое слово в кавычках
+    и с поиском по префиксу, слова объединяются через AND.
+    Синтаксис FTS5 из запроса не пропускается.
+    """
+    words = SEARCH_WORD.findall(query)[:SEARCH_MAX_WORDS]
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def search_posts(queryset, query):
+    """
+    Отфильтровать публикации по полнотекстовому запросу
+    и добавить поле rank: чем меньше, тем выше в выдаче.
+    """
+    match = match_expression(query)
+    if not match or not fts_available():
+        words = SEARCH_WORD.findall(query)[:SEARCH_MAX_WORDS]
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        queryset = queryset.filter(condition).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+        return queryset if words else queryset.none()
+    return queryset.filter(id__in=RawSQL(MATCHING_IDS, (match,))).annotate(
+        rank=RawSQL(MATCH_RANK, (match,), output_field=FloatField())
+    )
+
+
+def index_post(post):
+    """Заменить строку публикации в поисковом индексе."""
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [post.pk]
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, text)"
+            " VALUES (%s, %s, %s)",
+            [post.pk, post.title, post.text],
+        )
+
+
+def unindex_post(post_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [post_id]
+        )
+
+
+def rebuild_index(first_id, last_id):
+    """Переиндексировать публикации с id в диапазоне [first_id, last_id]."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid BETWEEN %s AND %s",
+            [first_id, last_id],
+        )
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, text)"
+            " SELECT id, title, text FROM blog_post"
+            " WHERE id BETWEEN %s AND %s",
+            [first_id, last_id],
+        )
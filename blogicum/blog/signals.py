@@ -0,0 +1,361 @@
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .caching import bump_page_generation, bump_version
+from .feeds import (
+    author_feed_scopes,
+    category_feed_scopes,
+    feed_scopes,
+    invalidate_feeds,
+)
+from .images import needs_variants
+from .lookups import category_cache, user_cache
+from .media import acquire_media, release_media
+from .models import (
+    ArchiveMonth,
+    AuthorStats,
+    Category,
+    Comment,
+    Follow,
+    Location,
+    Post,
+    make_excerpt,
+    month_start,
+)
+from .search import index_post, unindex_post
+from .sitemaps import chunk_number, update_sitemaps
+from .tasks import run_in_background
+from .timeline import backfill_timeline, drop_from_timeline, fan_out_post
+from .uploads import process_post_image
+
+User = get_user_model()
+
+
+SEARCH_FIELDS = {"title", "text"}
+
+
+def only_last_login(update_fields):
+    """Вход пользователя обновляет только last_login — это не правка."""
+    return bool(update_fields) and set(update_fields) <= {"last_login"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_cards(sender, instance, update_fields=None, **kwargs):
+    """Сбросить карточки публикаций, показывающие изменённый объект."""
+    if not only_last_login(update_fields):
+        bump_version(sender, instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, update_fields=None, **kwargs):
+    """Убрать пользователя из кеша процесса для страницы профиля."""
+    if not only_last_login(update_fields):
+        user_cache.discard(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_cached_category(sender, instance, **kwargs):
+    category_cache.discard(instance.pk)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_pages(sender, update_fields=None, **kwargs):
+    """Сбросить страницы для анонимов после изменения их содержимого."""
+    if not only_last_login(update_fields):
+        bump_page_generation()
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_post(sender, instance, **kwargs):
+    """Отметить в публикации изменение её комментариев."""
+    Post.objects.filter(pk=instance.post_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    """Обновить публикацию в поисковом индексе при правке её текста."""
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        index_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def count_new_post(sender, instance, created, **kwargs):
+    """Учесть новый пост в числе публикаций автора."""
+    if not created:
+        return
+    stats = AuthorStats.objects.filter(author_id=instance.author_id)
+    if not stats.change_post_count(1):
+        AuthorStats.objects.refresh_for([instance.author_id])
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    AuthorStats.objects.filter(author_id=instance.author_id).change_post_count(
+        -1
+    )
+
+
+def is_counted(is_published, pub_date):
+    """Учтён ли пост в счётчике своей категории."""
+    return is_published and pub_date <= timezone.now()
+
+
+@receiver(pre_save, sender=Post)
+def fill_raw_excerpt(sender, instance, raw=False, **kwargs):
+    """
+    Заполнить анонс при загрузке фикстур: loaddata сохраняет строки
+    в обход Post.save, где анонс обычно и считается.
+    """
+    if raw and not instance.excerpt:
+        instance.excerpt = make_excerpt(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    """Запомнить категорию, публикацию, дату и фото поста до сохранения."""
+    instance._state_before = instance._image_before = None
+    if instance.pk is None:
+        return
+    before = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list("category_id", "is_published", "pub_date", "image")
+        .first()
+    )
+    if before is not None:
+        instance._state_before = before[:3]
+        instance._image_before = before[3]
+
+
+@receiver(post_save, sender=Post)
+def count_post_in_category(sender, instance, **kwargs):
+    """Сдвинуть счётчики затронутых категорий и обновить их даты."""
+    deltas = Counter()
+    before = getattr(instance, "_state_before", None)
+    if before is not None:
+        category_id, *visibility = before
+        deltas[category_id] -= int(is_counted(*visibility))
+    deltas[instance.category_id] += int(
+        is_counted(instance.is_published, instance.pub_date)
+    )
+    for category_id, delta in deltas.items():
+        if category_id is not None:
+            Category.objects.filter(pk=category_id).change_post_count(delta)
+
+
+@receiver(post_save, sender=Post)
+def count_post_in_archive(sender, instance, **kwargs):
+    """Пересчитать месяцы архива, которые пост покинул или пополнил."""
+    before = getattr(instance, "_state_before", None)
+    state = (instance.category_id, instance.is_published, instance.pub_date)
+    if before == state:
+        return
+    months = {month_start(instance.pub_date)}
+    if before is not None:
+        months.add(month_start(before[2]))
+    ArchiveMonth.objects.recount(months)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_archived_post(sender, instance, **kwargs):
+    ArchiveMonth.objects.recount([month_start(instance.pub_date)])
+
+
+@receiver(pre_save, sender=Category)
+def remember_category_state(sender, instance, **kwargs):
+    instance._was_published = (
+        Category.objects.filter(pk=instance.pk)
+        .values_list("is_published", flat=True)
+        .first()
+        if instance.pk is not None
+        else None
+    )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def rebuild_archive(sender, instance, **kwargs):
+    """
+    Категория скрыта, открыта или удалена: её посты во всех месяцах
+    меняют видимость, поэтому архив пересчитывается целиком.
+    """
+    if kwargs["signal"] is post_save:
+        was_published = getattr(instance, "_was_published", None)
+        if was_published is None or was_published == instance.is_published:
+            return
+    elif not instance.is_published:
+        return
+    ArchiveMonth.objects.rebuild()
+
+
+@receiver(post_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    counted = is_counted(instance.is_published, instance.pub_date)
+    Category.objects.filter(pk=instance.category_id).change_post_count(
+        -int(counted)
+    )
+
+
+@receiver(post_save, sender=Post)
+def fan_out_to_timelines(sender, instance, **kwargs):
+    """Разложить пост по лентам подписчиков, если изменилась его видимость."""
+    before = getattr(instance, "_state_before", None)
+    if before is None and not instance.is_published:
+        return
+    if before is not None and before[1:] == (
+        instance.is_published,
+        instance.pub_date,
+    ):
+        return
+    run_in_background(fan_out_post, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def follow_author(sender, instance, created, **kwargs):
+    if not created:
+        return
+    stats = AuthorStats.objects.filter(author_id=instance.author_id)
+    if not stats.change_follower_count(1):
+        AuthorStats.objects.refresh_for([instance.author_id])
+    backfill_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def unfollow_author(sender, instance, **kwargs):
+    AuthorStats.objects.filter(
+        author_id=instance.author_id
+    ).change_follower_count(-1)
+    drop_from_timeline(instance.user_id, instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_feeds(sender, instance, **kwargs):
+    """Сбросить ленты, в которых пост был или появится."""
+    scopes = set(feed_scopes(instance.category_id, instance.author_id))
+    before = getattr(instance, "_state_before", None)
+    if before is not None:
+        scopes.update(feed_scopes(category_id=before[0]))
+    invalidate_feeds(sorted(scopes))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_feeds(sender, instance, **kwargs):
+    """После удаления категории её посты уже не найти по ней."""
+    instance._feed_scopes = category_feed_scopes(instance.pk)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, **kwargs):
+    """Название категории выводится в записях лент с её постами."""
+    scopes = getattr(instance, "_feed_scopes", None)
+    invalidate_feeds(scopes or category_feed_scopes(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_feeds(sender, instance, update_fields=None, **kwargs):
+    """Имя автора выводится в записях лент, где есть его посты."""
+    if not only_last_login(update_fields):
+        invalidate_feeds(author_feed_scopes(instance.pk))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def update_post_sitemaps(sender, instance, **kwargs):
+    """Переписать файл карты с постом и файлы с датами его категорий."""
+    category_ids = {instance.category_id}
+    before = getattr(instance, "_state_before", None)
+    if before is not None:
+        category_ids.add(before[0])
+    chunks = [("posts", chunk_number(instance.pk))] + [
+        ("categories", chunk_number(category_id))
+        for category_id in category_ids
+        if category_id is not None
+    ]
+    run_in_background(update_sitemaps, chunks)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def update_category_sitemaps(sender, instance, **kwargs):
+    """При смене видимости категории меняются и все файлы постов."""
+    sections = []
+    was_published = getattr(instance, "_was_published", None)
+    if kwargs["signal"] is post_delete or (
+        was_published is not None and was_published != instance.is_published
+    ):
+        sections.append("posts")
+    run_in_background(
+        update_sitemaps,
+        [("categories", chunk_number(instance.pk))],
+        sections,
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def update_profile_sitemaps(sender, instance, update_fields=None, **kwargs):
+    if not only_last_login(update_fields):
+        run_in_background(
+            update_sitemaps, [("profiles", chunk_number(instance.pk))]
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, **kwargs):
+    """Перенести ссылку со старого фото поста на новое."""
+    image = instance.image.name or ""
+    image_before = getattr(instance, "_image_before", None) or ""
+    if image == image_before:
+        return
+    if image:
+        acquire_media(image)
+    if image_before:
+        release_media(image_before)
+
+
+@receiver(post_delete, sender=Post)
+def release_deleted_image(sender, instance, **kwargs):
+    if instance.image.name:
+        release_media(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def make_image_variants(sender, instance, **kwargs):
+    """
+    Обработать новое фото и сделать копии или убрать копии снятого.
+    Подключён после учёта ссылок: обработка снимает ссылку с исходника.
+    """
+    if needs_variants(instance):
+        run_in_background(process_post_image, instance.pk)
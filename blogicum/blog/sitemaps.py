@@ -0,0 +1,308 @@
+import os
+import re
+import tempfile
+from datetime import datetime, timezone as dt_timezone
+from http import HTTPStatus
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Category, Post
+from .sites import site_url
+from .tasks import run_in_background
+
+User = get_user_model()
+
+SITEMAP_CHUNK_SIZE = 50000
+SITEMAP_BATCH_SIZE = 1000
+# Перестройка идёт в одном фоновом потоке; ключ снимается по её окончании.
+SITEMAP_LOCK_KEY = "blog:sitemaps:building"
+SITEMAP_LOCK_TIMEOUT = 60 * 10
+SITEMAP_RETRY_AFTER = 60
+SITEMAP_INDEX = "sitemap.xml"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+CHUNK_NAME = re.compile(r"^sitemap-(?P<section>\w+)-(?P<number>\d+)\.xml$")
+
+
+class Section:
+    """
+    Раздел карты сайта: строки values_list с первичным ключом первым,
+    адрес и дата изменения для каждой строки.
+    """
+
+    def __init__(self, name, rows, location, lastmod=None):
+        self.name = name
+        self.rows = rows
+        self.location = location
+        self.lastmod = lastmod
+
+    def last_pk(self):
+        return self.rows().model.objects.aggregate(last=Max("pk"))["last"]
+
+
+SECTIONS = {
+    section.name: section
+    for section in (
+        Section(
+            "posts",
+            lambda: Post.objects.published().values_list("pk", "updated_at"),
+            lambda row: reverse("blog:post_detail", args=[row[0]]),
+            lambda row: row[1],
+        ),
+        Section(
+            "categories",
+            lambda: Category.objects.filter(is_published=True).values_list(
+                "pk", "slug", "latest_pub_date"
+            ),
+            lambda row: reverse("blog:category", args=[row[1]]),
+            lambda row: row[2],
+        ),
+        Section(
+            "profiles",
+            lambda: User.objects.filter(is_active=True).values_list(
+                "pk", "username"
+            ),
+            lambda row: reverse("blog:profile", args=[row[1]]),
+        ),
+    )
+}
+
+
+def sitemap_root():
+    return Path(
+        getattr(settings, "BLOG_SITEMAP_ROOT", settings.BASE_DIR / "sitemaps")
+    )
+
+
+def chunk_size():
+    """Адресов в одном файле: не больше 50 000 по протоколу sitemaps."""
+    return getattr(settings, "BLOG_SITEMAP_CHUNK_SIZE", SITEMAP_CHUNK_SIZE)
+
+
+def chunk_number(pk):
+    """Номер файла раздела: файлы нарезаны по диапазонам первичных ключей."""
+    return (pk - 1) // chunk_size()
+
+
+def chunk_path(section, number):
+    return sitemap_root() / f"sitemap-{section}-{number}.xml"
+
+
+def iterate_rows(queryset, first_pk, last_pk, batch_size=SITEMAP_BATCH_SIZE):
+    """
+    Строки диапазона ключей пачками по ключу (keyset): в памяти не больше
+    одной пачки, и каждая пачка берётся по индексу первичного ключа.
+    """
+    queryset = queryset.filter(pk__lte=last_pk).order_by("pk")
+    last_seen = first_pk - 1
+    while True:
+        rows = list(queryset.filter(pk__gt=last_seen)[:batch_size])
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        last_seen = rows[-1][0]
+
+
+def w3c_date(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def write_atomically(path, header, entries, footer, keep_empty=False):
+    """
+    Записать файл по записям во временный и подменить им старый,
+    чтобы читатели не увидели файл наполовину. Файл без записей
+    удаляется, если keep_empty не задан. Возвращает число записей.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+    ) as tmp:
+        tmp.write(header)
+        for entry in entries:
+            tmp.write(entry)
+            written += 1
+        tmp.write(footer)
+    if written or keep_empty:
+        os.replace(tmp.name, path)
+    else:
+        os.unlink(tmp.name)
+        path.unlink(missing_ok=True)
+    return written
+
+
+def chunk_entries(section, number):
+    base = site_url()
+    size = chunk_size()
+    rows = iterate_rows(
+        section.rows(), number * size + 1, (number + 1) * size
+    )
+    for row in rows:
+        entry = f"<url><loc>{escape(base + section.location(row))}</loc>"
+        lastmod = section.lastmod(row) if section.lastmod else None
+        if lastmod is not None:
+            entry += f"<lastmod>{w3c_date(lastmod)}</lastmod>"
+        yield entry + "</url>\n"
+
+
+def write_chunk(name, number):
+    """Переписать один файл раздела; возвращает число адресов в нём."""
+    return write_atomically(
+        chunk_path(name, number),
+        XML_HEADER + f'<urlset xmlns="{SITEMAP_XMLNS}">\n',
+        chunk_entries(SECTIONS[name], number),
+        "</urlset>\n",
+    )
+
+
+def chunk_files():
+    """Файлы разделов в порядке разделов и номеров."""
+    found = []
+    with os.scandir(sitemap_root()) as entries:
+        for entry in entries:
+            match = CHUNK_NAME.match(entry.name)
+            if match and match["section"] in SECTIONS:
+                found.append((match["section"], int(match["number"]), entry))
+    order = list(SECTIONS)
+    found.sort(key=lambda item: (order.index(item[0]), item[1]))
+    return found
+
+
+def index_entries():
+    base = site_url()
+    for _, _, entry in chunk_files():
+        modified = datetime.fromtimestamp(
+            entry.stat().st_mtime, tz=dt_timezone.utc
+        )
+        loc = escape(base + reverse("blog:sitemap", args=[entry.name]))
+        yield (
+            f"<sitemap><loc>{loc}</loc>"
+            f"<lastmod>{w3c_date(modified)}</lastmod></sitemap>\n"
+        )
+
+
+def write_index():
+    """Индекс пишется и пустым: по нему видно, что карта уже построена."""
+    write_atomically(
+        sitemap_root() / SITEMAP_INDEX,
+        XML_HEADER + f'<sitemapindex xmlns="{SITEMAP_XMLNS}">\n',
+        index_entries(),
+        "</sitemapindex>\n",
+        keep_empty=True,
+    )
+
+
+def rebuild_section(name):
+    """Переписать все файлы раздела, убрав файлы за последним ключом."""
+    last_pk = SECTIONS[name].last_pk() or 0
+    last_number = chunk_number(last_pk) if last_pk else -1
+    for number in range(last_number + 1):
+        write_chunk(name, number)
+    root = sitemap_root()
+    if root.exists():
+        for section, number, entry in chunk_files():
+            if section == name and number > last_number:
+                os.unlink(entry.path)
+
+
+def rebuild_sitemaps():
+    for name in SECTIONS:
+        rebuild_section(name)
+    write_index()
+
+
+def is_built():
+    return (sitemap_root() / SITEMAP_INDEX).exists()
+
+
+def due_chunks():
+    """
+    Отложенные посты выходят без сохранения: файлы с постами,
+    вышедшими после последней записи индекса, пора переписать.
+    """
+    built_at = datetime.fromtimestamp(
+        (sitemap_root() / SITEMAP_INDEX).stat().st_mtime, tz=dt_timezone.utc
+    )
+    due = (
+        Post.objects.published()
+        .filter(pub_date__gt=built_at)
+        .values_list("pk", flat=True)
+    )
+    return {("posts", chunk_number(pk)) for pk in due}
+
+
+def update_sitemaps(chunks=(), sections=()):
+    """
+    Переписать изменившиеся файлы и индекс. Пока карта не построена
+    командой или в фоне после первого запроса, обновлять в ней нечего.
+    """
+    if not is_built():
+        return
+    for name in sections:
+        rebuild_section(name)
+    for name, number in sorted(set(chunks) | due_chunks()):
+        if name not in sections:
+            write_chunk(name, number)
+    write_index()
+
+
+def run_locked(func):
+    try:
+        func()
+    finally:
+        cache.delete(SITEMAP_LOCK_KEY)
+
+
+def schedule_sitemaps(func):
+    """
+    Перестроить карту в фоне, если этим уже не занят другой запрос:
+    частые обращения поисковиков не запускают перестройку наперегонки.
+    """
+    if cache.add(SITEMAP_LOCK_KEY, True, SITEMAP_LOCK_TIMEOUT):
+        run_in_background(run_locked, func)
+
+
+def serve_sitemap(request, filename=SITEMAP_INDEX):
+    """
+    Индекс или файл раздела с диска. Ненаписанная карта строится в фоне,
+    а до тех пор отвечает 503; вышедшие отложенные посты дописываются
+    в фоне, пока отдаются текущие файлы.
+    """
+    match = CHUNK_NAME.match(filename)
+    if filename != SITEMAP_INDEX and (
+        match is None or match["section"] not in SECTIONS
+    ):
+        raise Http404("Нет такой карты сайта.")
+    if not is_built():
+        schedule_sitemaps(rebuild_sitemaps)
+    elif due_chunks():
+        schedule_sitemaps(update_sitemaps)
+    if not is_built():
+        response = HttpResponse(
+            "Карта сайта строится.", status=HTTPStatus.SERVICE_UNAVAILABLE
+        )
+        response["Retry-After"] = SITEMAP_RETRY_AFTER
+        return response
+    path = sitemap_root() / filename
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        raise Http404("Нет такой карты сайта.")
+    response = get_conditional_response(
+        request, last_modified=int(stat.st_mtime)
+    )
+    if response is None:
+        response = FileResponse(
+            open(path, "rb"), content_type="application/xml"
+        )
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    return response
@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.contrib.sites.models import Site
+
+SITE_SCHEME = "https"
+
+
+def site_scheme():
+    return getattr(settings, "BLOG_SITE_SCHEME", SITE_SCHEME)
+
+
+def site_url():
+    """
+    Адрес сайта для ссылок, которые строятся вне запроса, — в картах
+    сайта и лентах. Домен задаётся в админке (django.contrib.sites).
+    """
+    return f"{site_scheme()}://{Site.objects.get_current().domain}"
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def apply_pragmas(cursor, pragmas):
+    """Выполнить PRAGMA из словаря «имя: значение» на курсоре SQLite."""
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def tune_sqlite(sender, connection, **kwargs):
+    """
+    Настроить каждое новое соединение с SQLite по SQLITE_PRAGMAS:
+    WAL не даёт читателям ждать писателя, busy_timeout заставляет
+    писателей ждать блокировку вместо «database is locked».
+    """
+    pragmas = getattr(settings, "SQLITE_PRAGMAS", None)
+    if connection.vendor != "sqlite" or not pragmas:
+        return
+    with connection.cursor() as cursor:
+        apply_pragmas(cursor, pragmas)
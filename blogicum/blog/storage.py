@@ -0,0 +1,99 @@
+import hashlib
+import os
+import re
+
+from django.conf import settings
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .models import MediaFile
+
+HASH_CHUNK_SIZE = 64 * 1024
+SHARD_DEPTH = 2
+SHARD_WIDTH = 2
+INCOMING_DIR = ".incoming"
+CONTENT_NAME = re.compile(
+    r"(?:^|/)[0-9a-f]{2}/[0-9a-f]{2}/(?P<digest>[0-9a-f]{64})\.\w+$"
+)
+
+
+def content_name(directory, digest, extension):
+    """
+    Имя файла по хешу содержимого: каталог поля, затем уровни
+    по первым символам хеша — ни в одном каталоге не копится слишком
+    много файлов.
+    """
+    shards = [
+        digest[level * SHARD_WIDTH:(level + 1) * SHARD_WIDTH]
+        for level in range(SHARD_DEPTH)
+    ]
+    return "/".join(
+        part for part in (directory, *shards, digest + extension) if part
+    )
+
+
+def content_digest(name):
+    """Хеш из имени файла хранилища; None для файлов с обычными именами."""
+    match = CONTENT_NAME.search(name)
+    if match is None:
+        return None
+    digest = match["digest"]
+    shards = content_name("", digest, "").split("/")[:SHARD_DEPTH]
+    return digest if name.split("/")[-SHARD_DEPTH - 1:-1] == shards else None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранилище, где имя файла — SHA-256 его содержимого. Загрузка
+    хешируется по частям по пути на диск, одинаковые файлы хранятся
+    один раз. Кто ссылается на файл, учитывает MediaFile.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определит содержимое: свободное имя подбирать не нужно.
+        return name
+
+    def _save(self, name, content):
+        directory, filename = os.path.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        chunk_size = getattr(
+            settings, "BLOG_MEDIA_CHUNK_SIZE", HASH_CHUNK_SIZE
+        )
+        temporary = os.path.join(incoming, os.urandom(16).hex())
+        try:
+            if hasattr(content, "temporary_file_path"):
+                # Большая загрузка уже на диске: хешируем её и переносим.
+                for chunk in content.chunks(chunk_size):
+                    digest.update(chunk)
+                file_move_safe(content.temporary_file_path(), temporary)
+            else:
+                # Права как у FileSystemStorage: 0o666 с учётом umask.
+                fd = os.open(temporary, self.OS_OPEN_FLAGS, 0o666)
+                with os.fdopen(fd, "wb") as target:
+                    for chunk in content.chunks(chunk_size):
+                        digest.update(chunk)
+                        target.write(chunk)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+        name = content_name(directory, digest.hexdigest(), extension)
+        full_path = self.path(name)
+        # Удаление файла без ссылок держит ту же блокировку записи:
+        # файл либо уже удалён и будет записан заново, либо получит
+        # свежую дату и удалять его не станут.
+        with transaction.atomic():
+            list(MediaFile.objects.select_for_update().filter(name=name))
+            if os.path.exists(full_path):
+                os.unlink(temporary)
+                os.utime(full_path)
+                return name
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            os.replace(temporary, full_path)
+        return name
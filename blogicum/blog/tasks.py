@@ -0,0 +1,79 @@
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+BACKGROUND_WORKERS = 2
+IMAGE_PROCESSES = 2
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_process_pool = None
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(
+                settings, "BLOG_BACKGROUND_WORKERS", BACKGROUND_WORKERS
+            ),
+            thread_name_prefix="blog-background",
+        )
+    return _executor
+
+
+def get_process_pool():
+    """
+    Пул процессов для работы, упирающейся в процессор, — обработки
+    изображений. Процессы запускаются заново (spawn), а не копией
+    сервера с его потоками и соединениями.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=getattr(
+                settings, "BLOG_IMAGE_PROCESSES", IMAGE_PROCESSES
+            ),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _process_pool
+
+
+def _run(func, args):
+    close_old_connections()
+    try:
+        func(*args)
+    except Exception:
+        logger.exception("Фоновая задача %s завершилась ошибкой.", func)
+    finally:
+        close_old_connections()
+
+
+def run_in_background(func, *args):
+    """
+    Выполнить func(*args) в фоновом потоке после коммита транзакции.
+    При BLOG_BACKGROUND_TASKS = False задача выполняется сразу,
+    в том же потоке и транзакции, — так удобнее в тестах и скриптах.
+    """
+    if not getattr(settings, "BLOG_BACKGROUND_TASKS", True):
+        func(*args)
+        return
+    transaction.on_commit(lambda: get_executor().submit(_run, func, args))
+
+
+def run_in_processes(func, jobs):
+    """
+    Выполнить func(*args) для каждого набора аргументов из jobs в пуле
+    процессов и вернуть результаты по порядку. func и её аргументы
+    должны импортироваться без Django. При BLOG_BACKGROUND_TASKS = False
+    задачи выполняются в текущем процессе.
+    """
+    if not getattr(settings, "BLOG_BACKGROUND_TASKS", True):
+        return [func(*args) for args in jobs]
+    pool = get_process_pool()
+    futures = [pool.submit(func, *args) for args in jobs]
+    return [future.result() for future in futures]
@@ -0,0 +1,19 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.caching import render_post_card
+from blog.images import image_context
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    """Карточка публикации из кеша фрагментов."""
+    return mark_safe(render_post_card(post))
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, kind):
+    """Фото публикации: копия нужного размера со srcset или исходное."""
+    return image_context(post, kind)
@@ -0,0 +1,182 @@
+from heapq import merge
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import CursorPage, InvalidCursor, decode_cursor, encode_cursor
+
+FANOUT_CHUNK_SIZE = 1000
+FANOUT_MAX_FOLLOWERS = 10000
+FOLLOW_BACKFILL = 50
+
+
+def fanout_max_followers():
+    return getattr(
+        settings, "BLOG_FANOUT_MAX_FOLLOWERS", FANOUT_MAX_FOLLOWERS
+    )
+
+
+def popular_authors(author_ids):
+    """
+    Авторы, чьи посты не раскладываются по лентам подписчиков:
+    их слишком много, и ленты дочитывают такие посты при чтении.
+    """
+    return set(
+        AuthorStats.objects.filter(
+            author_id__in=author_ids,
+            follower_count__gt=fanout_max_followers(),
+        ).values_list("author_id", flat=True)
+    )
+
+
+def fan_out_post(post_id):
+    """
+    Разложить пост по лентам подписчиков автора пачками bulk_create.
+    Снятый с публикации пост убирается из лент, у перенесённого
+    по времени обновляется дата в уже разложенных записях.
+    """
+    post = (
+        Post.objects.filter(pk=post_id)
+        .values("author_id", "is_published", "pub_date")
+        .first()
+    )
+    entries = TimelineEntry.objects.filter(post_id=post_id)
+    if post is None:
+        return
+    if not post["is_published"]:
+        entries.delete()
+        return
+    entries.exclude(pub_date=post["pub_date"]).update(
+        pub_date=post["pub_date"]
+    )
+    if popular_authors([post["author_id"]]):
+        return
+    chunk_size = getattr(settings, "BLOG_FANOUT_CHUNK_SIZE", FANOUT_CHUNK_SIZE)
+    followers = Follow.objects.filter(author_id=post["author_id"]).order_by(
+        "user_id"
+    )
+    last_user_id = 0
+    while True:
+        user_ids = list(
+            followers.filter(user_id__gt=last_user_id).values_list(
+                "user_id", flat=True
+            )[:chunk_size]
+        )
+        if not user_ids:
+            break
+        with transaction.atomic():
+            TimelineEntry.objects.bulk_create(
+                [
+                    TimelineEntry(
+                        user_id=user_id,
+                        post_id=post_id,
+                        pub_date=post["pub_date"],
+                    )
+                    for user_id in user_ids
+                ],
+                ignore_conflicts=True,
+            )
+        last_user_id = user_ids[-1]
+
+
+def backfill_timeline(user_id, author_id):
+    """Положить в ленту нового подписчика последние посты автора."""
+    if popular_authors([author_id]):
+        return
+    posts = (
+        Post.objects.filter(author_id=author_id, is_published=True)
+        .order_by("-pub_date", "-id")
+        .values_list("id", "pub_date")[:FOLLOW_BACKFILL]
+    )
+    TimelineEntry.objects.bulk_create(
+        [
+            TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+            for post_id, pub_date in posts
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def drop_from_timeline(user_id, author_id):
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id
+    ).delete()
+
+
+def _seek(queryset, key, values):
+    if values is None:
+        return queryset
+    pub_date, post_id = values
+    return queryset.filter(
+        Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, **{key: post_id})
+    )
+
+
+def _parse_cursor(cursor):
+    """Ключ (pub_date, id) из курсора ленты или InvalidCursor."""
+    direction, values = decode_cursor(cursor)
+    if direction != "n" or len(values) != 2:
+        raise InvalidCursor("Некорректный курсор.")
+    pub_date, post_id = values
+    try:
+        pub_date = parse_datetime(pub_date)
+    except (TypeError, ValueError):
+        pub_date = None
+    if (
+        pub_date is None
+        or isinstance(post_id, bool)
+        or not isinstance(post_id, int)
+    ):
+        raise InvalidCursor("Некорректный курсор.")
+    return pub_date, post_id
+
+
+def timeline_page(user, per_page, cursor=None):
+    """
+    Страница личной ленты по курсору (pub_date, id), от новых к старым.
+    Основная часть читается из разложенной ленты пользователя, посты
+    популярных авторов — по индексу автора; обе выборки сливаются.
+    """
+    values = None if cursor is None else _parse_cursor(cursor)
+    now = timezone.now()
+    visible = {
+        "post__is_published": True,
+        "post__category__is_published": True,
+    }
+    entries = _seek(
+        TimelineEntry.objects.filter(user=user, pub_date__lte=now, **visible),
+        "post_id__lt",
+        values,
+    ).order_by("-pub_date", "-post_id")
+    rows = [entries.values_list("pub_date", "post_id")[:per_page + 1]]
+    popular = popular_authors(
+        Follow.objects.filter(user=user).values_list("author_id", flat=True)
+    )
+    if popular:
+        posts = _seek(
+            Post.objects.filter(
+                author_id__in=popular,
+                is_published=True,
+                category__is_published=True,
+                pub_date__lte=now,
+            ),
+            "id__lt",
+            values,
+        ).order_by("-pub_date", "-id")
+        rows.append(posts.values_list("pub_date", "id")[:per_page + 1])
+    keys = []
+    for key in merge(*map(list, rows), reverse=True):
+        if not keys or keys[-1] != key:
+            keys.append(key)
+    has_more = len(keys) > per_page
+    keys = keys[:per_page]
+    posts = Post.objects.for_cards().in_bulk([post_id for _, post_id in keys])
+    object_list = [posts[post_id] for _, post_id in keys if post_id in posts]
+    next_cursor = (
+        encode_cursor("n", list(keys[-1])) if has_more and keys else None
+    )
+    return CursorPage(object_list, None, next_cursor, None)
@@ -0,0 +1,113 @@
+import logging
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .images import build_variants
+from .imaging import EXTENSIONS, JPEG_QUALITY, MAX_SIZE, normalize_image
+from .media import acquire_media, release_media
+from .models import NormalizedImage, Post
+from .storage import INCOMING_DIR
+from .tasks import run_in_processes
+
+IMAGE_FORMAT = "JPEG"
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_file(source):
+    """
+    Обработать фото в пуле процессов и сохранить результат
+    в хранилище рядом с загрузками; вернуть имя и размеры. Если фото
+    не пришлось ни уменьшать, ни чистить от метаданных, а пережатое
+    вышло не меньше исходного, остаётся исходное.
+    """
+    incoming = default_storage.path(INCOMING_DIR)
+    os.makedirs(incoming, exist_ok=True)
+    temporary = os.path.join(incoming, os.urandom(16).hex())
+    try:
+        [(image_format, width, height, required)] = run_in_processes(
+            normalize_image,
+            [
+                (
+                    default_storage.path(source),
+                    temporary,
+                    getattr(settings, "BLOG_IMAGE_FORMAT", IMAGE_FORMAT),
+                    getattr(settings, "BLOG_IMAGE_QUALITY", JPEG_QUALITY),
+                    getattr(settings, "BLOG_IMAGE_MAX_SIZE", MAX_SIZE),
+                )
+            ],
+        )
+        smaller = os.path.getsize(temporary) < default_storage.size(source)
+        if not (required or smaller):
+            return source, width, height
+        upload_to = Post._meta.get_field("image").upload_to
+        with open(temporary, "rb") as content:
+            name = default_storage.save(
+                f"{upload_to}/normalized{EXTENSIONS[image_format]}",
+                File(content),
+            )
+    finally:
+        if os.path.exists(temporary):
+            os.unlink(temporary)
+    return name, width, height
+
+
+def normalized_image(source):
+    """
+    Запись об обработке фото. Одинаковые загрузки хранятся одним
+    файлом, поэтому обработка делается один раз на содержимое;
+    уже обработанное фото второй раз не пережимается.
+    """
+    record = NormalizedImage.objects.for_name(source).first()
+    if record is not None and default_storage.exists(record.name):
+        return record
+    name, width, height = normalize_file(source)
+    record, _ = NormalizedImage.objects.update_or_create(
+        original=source,
+        defaults={
+            "name": name,
+            "original_size": default_storage.size(source),
+            "size": default_storage.size(name),
+            "width": width,
+            "height": height,
+        },
+    )
+    return record
+
+
+def replace_post_image(post_id, source, name):
+    """
+    Подставить обработанное фото, если автор не сменил фото за это
+    время. Ссылка на новый файл учитывается до подстановки, так что
+    файл не удалят, пока на него уже ссылается публикация.
+    """
+    acquire_media(name)
+    replaced = Post.objects.filter(pk=post_id, image=source).update(
+        image=name, updated_at=timezone.now()
+    )
+    release_media(source if replaced else name)
+
+
+def process_post_image(post_id):
+    """
+    Обработать новое фото публикации и сделать его копии. Вызывается
+    в фоне: запрос с загрузкой не ждёт пережатия.
+    """
+    source = (
+        Post.objects.filter(pk=post_id)
+        .values_list("image", flat=True)
+        .first()
+    )
+    if source and getattr(settings, "BLOG_IMAGE_NORMALIZE", True):
+        try:
+            record = normalized_image(source)
+        except OSError:
+            logger.warning("Не удалось обработать фото %s.", source)
+        else:
+            if record.name != source:
+                replace_post_image(post_id, source, record.name)
+    build_variants(post_id)
@@ -1,6 +1,6 @@
 from django.urls import include, path
 
-from . import views
+from . import feeds, sitemaps, views
 
 app_name = "blog"
 
@@ -19,6 +19,10 @@ posts_urls = [
         "<int:post_id>/comment/", views.CommentCreateView.as_view(),
         name="add_comment"
     ),
+    path(
+        "<int:post_id>/comments/", views.CommentListView.as_view(),
+        name="comments"
+    ),
     path(
         "<int:post_id>/edit_comment/<int:comment_id>/",
         views.CommentUpdateView.as_view(),
@@ -38,12 +42,62 @@ profile_urls = [
     path(
         "<slug:username>/", views.ProfileDetailView.as_view(), name="profile"
     ),
+    path(
+        "<slug:username>/follow/", views.FollowView.as_view(), name="follow"
+    ),
+    path(
+        "<slug:username>/unfollow/",
+        views.UnfollowView.as_view(),
+        name="unfollow",
+    ),
+]
+
+feeds_urls = [
+    path("<str:fmt>/", feeds.serve_feed, name="posts_feed"),
+    path(
+        "category/<slug:slug>/<str:fmt>/",
+        feeds.serve_feed,
+        name="category_feed",
+    ),
+    path(
+        "author/<slug:username>/<str:fmt>/",
+        feeds.serve_feed,
+        name="author_feed",
+    ),
+]
+
+archive_urls = [
+    path("", views.ArchiveIndexView.as_view(), name="archive"),
+    path(
+        "<int:year>/", views.PostArchiveView.as_view(), name="archive_year"
+    ),
+    path(
+        "<int:year>/<int:month>/",
+        views.PostArchiveView.as_view(),
+        name="archive_month",
+    ),
+    path(
+        "<int:year>/<int:month>/<int:day>/",
+        views.PostArchiveView.as_view(),
+        name="archive_day",
+    ),
 ]
 
 urlpatterns = [
     path("", views.PostListView.as_view(), name="index"),
     path("posts/", include(posts_urls)),
     path("profile/", include(profile_urls)),
+    path("feed/", views.FeedView.as_view(), name="feed"),
+    path("feeds/", include(feeds_urls)),
+    path("sitemap.xml", sitemaps.serve_sitemap, name="sitemap_index"),
+    path(
+        "sitemaps/<str:filename>", sitemaps.serve_sitemap, name="sitemap"
+    ),
+    path("archive/", include(archive_urls)),
+    path("search/", views.PostSearchView.as_view(), name="search"),
+    path(
+        "category/", views.CategoryIndexView.as_view(), name="categories"
+    ),
     path(
         "category/<slug:slug>/",
         views.CategoryListView.as_view(), name="category"
@@ -1,36 +1,141 @@
+from datetime import date, datetime, time, timedelta
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Count
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
-from django.views.generic import CreateView, DeleteView, DetailView, UpdateView
-
+from django.utils.functional import cached_property
+from django.utils.timezone import make_aware
+from django.views.generic import (
+    CreateView,
+    DeleteView,
+    DetailView,
+    ListView,
+    TemplateView,
+    UpdateView,
+    View,
+)
+
+from .caching import prefetch_post_cards
 from .forms import CommentForm, PostForm, ProfileForm
-from .mixins import CommentRedactMixin, PostListsMixin, PostRedactMixin
-from .models import Category, Comment, Post
+from .mixins import (
+    AnonymousPageCacheMixin,
+    CommentRedactMixin,
+    ConditionalGetMixin,
+    PostListsMixin,
+    PostRedactMixin,
+    StreamingFeedMixin,
+    VisiblePostMixin,
+    latest,
+)
+from .lookups import (
+    category_cache,
+    get_published_category,
+    get_user_by_username,
+)
+from .models import (
+    ArchiveMonth,
+    AuthorStats,
+    Category,
+    Comment,
+    Follow,
+    Post,
+)
+from .paginators import CursorPaginator, InvalidCursor
+from .search import search_posts
+from .timeline import timeline_page
 
 User = get_user_model()
 
 NEW_POSTS = 5
-
-
-class PostListView(PostListsMixin):
+COMMENTS_PER_PAGE = 20
+
+
+def get_comments_page(post, cursor=None):
+    """Страница комментов поста по курсору (created_at, id)."""
+    paginator = CursorPaginator(
+        post.comments.select_related("author"),
+        COMMENTS_PER_PAGE,
+        key_fields=("created_at", "id"),
+        descending=False,
+    )
+    try:
+        return paginator.page(cursor)
+    except InvalidCursor:
+        raise Http404("Некорректный курсор.")
+
+
+class PostListView(
+    ConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    StreamingFeedMixin,
+    PostListsMixin,
+):
     """Отображение списка постов на главной странице."""
 
     template_name = "blog/index.html"
 
 
-class CategoryListView(PostListsMixin):
+class CategoryIndexView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, ListView
+):
+    """
+    Список опубликованных категорий с числом публикаций и датой
+    последней из них — по сохранённой статистике, без GROUP BY.
+    """
+
+    template_name = "blog/categories.html"
+    context_object_name = "categories"
+
+    @cached_property
+    def categories(self):
+        return Category.objects.filter(is_published=True).order_by(
+            "title"
+        ).with_current_stats()
+
+    def get_queryset(self):
+        return self.categories
+
+    def get_last_modified(self):
+        return latest(
+            *(category.latest_pub_date for category in self.categories)
+        )
+
+
+class CategoryListView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostListsMixin
+):
     """Отображение списка постов конкретной категории."""
 
     template_name = "blog/category.html"
 
-    def get_queryset(self, *args, **kwargs):
-        self.category = get_object_or_404(
-            Category, slug=self.kwargs.get("slug"), is_published=True
+    @cached_property
+    def category(self):
+        return get_published_category(self.kwargs.get("slug"))
+
+    def get_last_modified(self):
+        """
+        Последняя публикация категории из её статистики
+        либо правка любой публикации. Кеш процесса может помнить
+        категорию, которую уже удалили или сняли с публикации
+        в другом процессе, поэтому она перепроверяется по базе.
+        """
+        categories = Category.objects.filter(
+            pk=self.category.pk, is_published=True
+        ).with_current_stats()
+        if not categories:
+            category_cache.discard(self.category.pk)
+            raise Http404("Категория снята с публикации.")
+        return latest(
+            categories[0].latest_pub_date,
+            Post.objects.aggregate(latest=Max("updated_at"))["latest"],
         )
+
+    def get_queryset(self, *args, **kwargs):
         queryset = super().get_queryset(*args, **kwargs).filter(
             category=self.category
         )
@@ -42,35 +147,197 @@ class CategoryListView(PostListsMixin):
         return context
 
 
-class ProfileDetailView(PostListsMixin):
+class PostSearchView(PostListsMixin):
+    """
+    Поиск по заголовкам и текстам опубликованных постов.
+    Выдача упорядочена по релевантности и листается курсором.
+    """
+
+    template_name = "blog/search.html"
+    query_kwarg = "q"
+
+    @cached_property
+    def query(self):
+        return self.request.GET.get(self.query_kwarg, "").strip()
+
+    def get_queryset(self, *args, **kwargs):
+        return search_posts(super().get_queryset(*args, **kwargs), self.query)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = CursorPaginator(
+            queryset, page_size, key_fields=("rank", "id"), descending=False
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Некорректный курсор.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+    def get_context_data(self, *args, **kwargs):
+        context = super().get_context_data(*args, **kwargs)
+        context["query"] = self.query
+        return context
+
+
+class ArchiveIndexView(AnonymousPageCacheMixin, TemplateView):
+    """Навигация по архиву: месяцы с числом публикаций."""
+
+    template_name = "blog/archive.html"
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["archive_months"] = ArchiveMonth.objects.navigation()
+        return context
+
+
+class PostArchiveView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, PostListsMixin
+):
+    """
+    Публикации за год, месяц или день. Период выбирается диапазоном
+    по индексу на pub_date, поэтому страница не зависит от размера архива.
+    """
+
+    template_name = "blog/archive.html"
+
+    @cached_property
+    def period(self):
+        """Первый день периода, его конец и название уровня архива."""
+        year = self.kwargs["year"]
+        month = self.kwargs.get("month")
+        day = self.kwargs.get("day")
+        try:
+            start = date(year, month or 1, day or 1)
+            if day:
+                return start, start + timedelta(days=1), "day"
+            if month:
+                end = (start + timedelta(days=32)).replace(day=1)
+                return start, end, "month"
+            return start, start.replace(year=year + 1), "year"
+        except (ValueError, OverflowError):
+            raise Http404("Такой даты нет.")
+
+    def get_queryset(self, *args, **kwargs):
+        start, end, _ = self.period
+        return super().get_queryset(*args, **kwargs).filter(
+            pub_date__gte=make_aware(datetime.combine(start, time.min)),
+            pub_date__lt=make_aware(datetime.combine(end, time.min)),
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["period_start"], _, context["period_level"] = self.period
+        context["archive_months"] = ArchiveMonth.objects.navigation()
+        return context
+
+
+class ProfileDetailView(
+    ConditionalGetMixin, StreamingFeedMixin, PostListsMixin
+):
     """Отображение страницы конкретного пользователя со всеми его постами."""
 
     template_name = "blog/profile.html"
 
-    def get_queryset(self, *args, **kwargs):
-        self.user = get_object_or_404(
-            User, username=self.kwargs.get("username")
+    @cached_property
+    def user(self):
+        return get_user_by_username(self.kwargs.get("username"))
+
+    @cached_property
+    def is_owner(self):
+        return self.user.pk == self.request.user.pk
+
+    @cached_property
+    def is_following(self):
+        return (
+            self.request.user.is_authenticated
+            and not self.is_owner
+            and Follow.objects.filter(
+                user=self.request.user, author=self.user
+            ).exists()
         )
-        if self.user != self.request.user:
-            queryset = super().get_queryset(*args, **kwargs).filter(
+
+    def get_etag_extra(self):
+        """Подписки не меняют дат страницы, но меняют кнопку на ней."""
+        return (self.is_following,)
+
+    def get_queryset(self, *args, **kwargs):
+        """
+        Автору — все его посты, включая скрытые и отложенные,
+        остальным — только опубликованные.
+        """
+        if not self.is_owner:
+            return super().get_queryset(*args, **kwargs).filter(
                 author=self.user
             )
-        queryset = (
-            Post.objects.select_related("author", "category", "location")
-            .all()
-            .order_by("-pub_date")
+        return (
+            Post.objects.for_cards()
             .filter(author=self.user)
-            .annotate(comment_count=Count("comments"))
+            .order_by("-pub_date", "-id")
         )
-        return queryset
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        """Автору посчитать страницы по сохранённому числу его постов."""
+        if self.is_owner:
+            kwargs["count"] = (
+                AuthorStats.objects.filter(author=self.user)
+                .values_list("post_count", flat=True)
+                .first()
+            )
+        return super().get_paginator(queryset, per_page, **kwargs)
 
     def get_context_data(self, *args, **kwargs):
         context = super().get_context_data(*args, **kwargs)
         context["profile"] = self.user
+        context["is_following"] = self.is_following
         return context
 
 
-class PostDetailView(DetailView):
+class FollowView(LoginRequiredMixin, View):
+    """Подписаться на автора."""
+
+    def post(self, request, *args, **kwargs):
+        author = get_user_by_username(kwargs["username"])
+        if author.pk != request.user.pk:
+            Follow.objects.get_or_create(user=request.user, author=author)
+        return redirect("blog:profile", username=author.username)
+
+
+class UnfollowView(LoginRequiredMixin, View):
+    """Отписаться от автора."""
+
+    def post(self, request, *args, **kwargs):
+        author = get_user_by_username(kwargs["username"])
+        Follow.objects.filter(user=request.user, author=author).delete()
+        return redirect("blog:profile", username=author.username)
+
+
+class FeedView(LoginRequiredMixin, TemplateView):
+    """
+    Личная лента: посты авторов, на которых подписан пользователь.
+    Читается из разложенной заранее ленты, листается курсором.
+    """
+
+    template_name = "blog/feed.html"
+    paginate_by = PostListsMixin.paginate_by
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        try:
+            page = timeline_page(
+                self.request.user,
+                self.paginate_by,
+                self.request.GET.get("cursor"),
+            )
+        except InvalidCursor:
+            raise Http404("Некорректный курсор.")
+        prefetch_post_cards(page)
+        context["page_obj"] = page
+        return context
+
+
+class PostDetailView(
+    ConditionalGetMixin, AnonymousPageCacheMixin, VisiblePostMixin, DetailView
+):
     """Отображение отдельного поста."""
 
     model = Post
@@ -82,23 +349,63 @@ class PostDetailView(DetailView):
         Определить автор или не автор делает запрос.
         Показать любой пост автору и только если опубликован - не автору.
         """
-        post = get_object_or_404(Post, id=self.kwargs["post_id"])
-        if post.author != self.request.user and (
-            not post.is_published or post.pub_date > timezone.now()
-        ):
-            raise Http404()
-        return post
+        return self.get_visible_post()
 
     def get_context_data(self, **kwargs):
         """
-        Запросить все комменты для выбранного поста
+        Запросить первую страницу комментов для выбранного поста,
+        остальные подгружаются через CommentListView.
         Дополнительно подгрузить авторов комментариев.
         """
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("author")
+        context["comments"] = get_comments_page(self.object)
         return context
 
+    def get_last_modified(self):
+        """
+        Последняя правка поста или его комментов либо его публикация.
+        Видимость проверяется до ответа 304: иначе по нему можно узнать
+        о скрытом посте.
+        """
+        post = self.get_visible_post()
+        if post.pub_date > timezone.now():
+            return post.updated_at
+        return latest(post.updated_at, post.pub_date)
+
+
+class CommentListView(VisiblePostMixin, View):
+    """
+    Следующие страницы комментов поста: HTML-фрагмент для догрузки
+    на странице поста или JSON при ?format=json.
+    """
+
+    template_name = "includes/comment_list.html"
+
+    def get(self, request, *args, **kwargs):
+        post = self.get_visible_post()
+        comments = get_comments_page(post, request.GET.get("cursor"))
+        if request.GET.get("format") == "json":
+            return JsonResponse(
+                {
+                    "comments": [
+                        {
+                            "id": comment.id,
+                            "author": comment.author.username,
+                            "text": comment.text,
+                            "created_at": comment.created_at.isoformat(),
+                        }
+                        for comment in comments
+                    ],
+                    "next_cursor": comments.next_cursor,
+                }
+            )
+        return render(
+            request,
+            self.template_name,
+            {"post": post, "comments": comments},
+        )
+
 
 class PostCreateView(LoginRequiredMixin, CreateView):
     model = Post
@@ -144,7 +451,13 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
         """
         form.instance.author = self.request.user
         form.instance.post = get_object_or_404(Post, pk=self.kwargs["post_id"])
-        return super().form_valid(form)
+        with transaction.atomic():
+            response = super().form_valid(form)
+            if self.object.is_published:
+                Post.objects.filter(
+                    pk=self.object.post_id
+                ).change_comment_count(1)
+        return response
 
 
 class ProfileUpdateView(LoginRequiredMixin, UpdateView):
@@ -168,6 +481,16 @@ class CommentUpdateView(LoginRequiredMixin, CommentRedactMixin, UpdateView):
 
 class CommentDeleteView(LoginRequiredMixin, CommentRedactMixin, DeleteView):
 
+    def delete(self, request, *args, **kwargs):
+        """Удалить коммент и уменьшить счётчик комментов поста."""
+        with transaction.atomic():
+            response = super().delete(request, *args, **kwargs)
+            if self.object.is_published:
+                Post.objects.filter(
+                    pk=self.object.post_id
+                ).change_comment_count(-1)
+        return response
+
     def get_success_url(self):
         """Передать канонический адрес из модели"""
         return self.object.get_absolute_url()
@@ -14,6 +14,7 @@ INSTALLED_APPS = [
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
+    "django.contrib.sites",
     "django.contrib.staticfiles",
     "debug_toolbar",
     "pages.apps.PagesConfig",
@@ -59,8 +60,79 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            "timeout": 5,
+        },
+    }
+}
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Кеш страниц, карточек и лент сбрасывается сменой счётчиков версий
+# в кеше. LocMemCache держит их в памяти одного процесса: с несколькими
+# воркерами остальные процессы отдают устаревшее до
+# BLOG_LOCAL_CACHE_TIMEOUT секунд после правки. Для нескольких воркеров
+# нужен общий кеш, например:
+#     "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+#     "LOCATION": "127.0.0.1:11211",
+# — тогда карточки и ленты живут полный срок.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
     }
 }
+BLOG_LOCAL_CACHE_TIMEOUT = 60
+
+BLOG_STREAMING_FEEDS = False
+
+# Кеш процесса для категорий и пользователей по слагу/имени.
+BLOG_LOOKUP_CACHE_SIZE = 256
+BLOG_LOOKUP_CACHE_TIMEOUT = 60
+
+# Фоновые задачи блога выполняются в пуле потоков после коммита.
+BLOG_BACKGROUND_TASKS = True
+BLOG_BACKGROUND_WORKERS = 2
+BLOG_IMAGE_PROCESSES = 2
+
+# Копии фото публикаций: ширина по виду копии и качество JPEG/WebP.
+BLOG_IMAGE_VARIANT_WIDTHS = {"thumb": 320, "detail": 640, "detail_2x": 1280}
+BLOG_IMAGE_QUALITY = 85
+# Загруженные фото пережимаются в фоне: без метаданных, не больше
+# BLOG_IMAGE_MAX_SIZE, в прогрессивный JPEG или WEBP с BLOG_IMAGE_QUALITY.
+BLOG_IMAGE_NORMALIZE = True
+BLOG_IMAGE_FORMAT = "JPEG"
+BLOG_IMAGE_MAX_SIZE = (2560, 2560)
+
+# Посты авторов с большим числом подписчиков не раскладываются по лентам.
+BLOG_FANOUT_MAX_FOLLOWERS = 10000
+BLOG_FANOUT_CHUNK_SIZE = 1000
+
+# Адреса в картах сайта и лентах: домен текущего сайта из админки
+# (django.contrib.sites) и схема BLOG_SITE_SCHEME.
+SITE_ID = 1
+BLOG_SITE_SCHEME = "https"
+
+# Карта сайта: файлы по диапазонам ключей, строятся в фоне.
+BLOG_SITEMAP_ROOT = BASE_DIR / "sitemaps"
+BLOG_SITEMAP_CHUNK_SIZE = 50000
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "blog": {"handlers": ["console"], "level": "INFO"},
+    },
+}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -101,6 +173,17 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "media/"
 
+# Загрузки хранятся по SHA-256 содержимого в каталогах по префиксу хеша.
+DEFAULT_FILE_STORAGE = "blog.storage.ContentAddressedStorage"
+BLOG_MEDIA_CHUNK_SIZE = 64 * 1024
+# Отдача загрузок: None — файл читает Django, только при DEBUG;
+# "x-accel-redirect" — nginx по internal-location BLOG_MEDIA_ACCEL_PREFIX,
+# который смотрит в MEDIA_ROOT; "x-sendfile" — Apache/lighttpd.
+BLOG_MEDIA_ACCEL = None
+BLOG_MEDIA_ACCEL_PREFIX = "/protected-media/"
+# Сборщик ничьих файлов (sweep_media по cron) не трогает файлы моложе часа.
+BLOG_MEDIA_SWEEP_GRACE_PERIOD = 60 * 60
+
 CSRF_FAILURE_VIEW = "pages.views.csrf_failure"
 
 EMAIL_BACKEND = "django.core.mail.backends.filebased.EmailBackend"
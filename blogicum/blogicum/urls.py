@@ -1,10 +1,11 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.media import serve_media
+
 handler404 = "pages.views.page_not_found"
 handler500 = "pages.views.internal_server_error"
 handler403 = "pages.views.csrf_failure"
@@ -23,7 +24,12 @@ urlpatterns = [
     ),
     path("auth/", include("django.contrib.auth.urls")),
     path("", include("blog.urls", namespace="index")),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path(
+        settings.MEDIA_URL.lstrip("/") + "<path:path>",
+        serve_media,
+        name="media",
+    ),
+]
 
 
 if settings.DEBUG:
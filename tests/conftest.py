@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,43 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def run_background_tasks_inline(request):
+    # В тестах с транзакциями on_commit срабатывает, и фоновые потоки
+    # писали бы в тестовую базу SQLite одновременно с самим тестом.
+    marker = request.node.get_closest_marker("django_db")
+    if marker is None or not marker.kwargs.get("transaction"):
+        yield
+        return
+    with override_settings(BLOG_BACKGROUND_TASKS=False):
+        yield
+
+
+@pytest.fixture
+def synchronous_tasks(settings):
+    """Фоновые задачи блога выполняются сразу, в потоке теста."""
+    settings.BLOG_BACKGROUND_TASKS = False
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    """Загрузки, копии фото и каталоги шардов — во временном каталоге."""
+    settings.MEDIA_ROOT = tmp_path / "media"
+    settings.MEDIA_ROOT.mkdir()
+    return settings.MEDIA_ROOT
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from blog.lookups import clear_lookup_caches
+
+    cache.clear()
+    clear_lookup_caches()
+    yield
+    cache.clear()
+    clear_lookup_caches()
+
+
 class SafeImportFromContextManager:
     def __init__(
         self,
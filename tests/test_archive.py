@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def archived_posts(mixer: Mixer, user, published_location, published_category):
+    moments = [
+        datetime(2023, 5, 10, 12, tzinfo=pytz.UTC),
+        datetime(2023, 5, 31, 23, tzinfo=pytz.UTC),
+        datetime(2023, 6, 1, 1, tzinfo=pytz.UTC),
+    ]
+    return mixer.cycle(len(moments)).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(moment for moment in moments),
+    )
+
+
+def archive_ids(client: Client, url):
+    response = client.get(url)
+    assert response.status_code == 200, f"Убедитесь, что страница `{url}` доступна."
+    return [post.id for post in response.context["page_obj"]]
+
+
+def test_archive_pages(user_client: Client, archived_posts):
+    may_10, may_31, june_1 = archived_posts
+    assert archive_ids(user_client, "/archive/2023/05/") == [may_31.id, may_10.id], (
+        "Убедитесь, что архив за месяц выводит публикации этого месяца"
+        " от новых к старым."
+    )
+    assert archive_ids(user_client, "/archive/2023/6/1/") == [june_1.id]
+    assert len(archive_ids(user_client, "/archive/2023/")) == 3
+    for url in ("/archive/2023/13/", "/archive/2023/2/30/"):
+        assert user_client.get(url).status_code == 404, (
+            f"Убедитесь, что для несуществующей даты `{url}` возвращается 404."
+        )
+
+
+def test_archive_navigation(
+    mixer: Mixer, user_client: Client, archived_posts, published_category
+):
+    from blog.models import ArchiveMonth
+
+    def navigation():
+        return [
+            (month.month.strftime("%Y-%m"), month.post_count)
+            for month in user_client.get("/archive/").context["archive_months"]
+        ]
+
+    assert navigation() == [("2023-06", 1), ("2023-05", 2)], (
+        "Убедитесь, что навигация архива выводит месяцы с числом публикаций."
+    )
+    archived_posts[0].pub_date += timedelta(days=30)
+    archived_posts[0].save()
+    archived_posts[1].delete()
+    assert navigation() == [("2023-06", 2)], (
+        "Убедитесь, что счётчики месяцев обновляются при переносе"
+        " и удалении публикаций."
+    )
+    published_category.is_published = False
+    published_category.save()
+    assert navigation() == [], (
+        "Убедитесь, что посты скрытой категории не учитываются в архиве."
+    )
+
+    now = datetime.now(tz=pytz.UTC)
+    published_category.is_published = True
+    published_category.save()
+    mixer.blend(
+        "blog.Post", category=published_category, pub_date=now + timedelta(days=40)
+    )
+    assert ArchiveMonth.objects.count() == 2 and navigation() == [
+        ("2023-06", 2)
+    ], "Убедитесь, что отложенные публикации не выводятся в навигации архива."
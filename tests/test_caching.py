@@ -0,0 +1,130 @@
+import pytest
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def card_renders(response):
+    return [
+        template
+        for template in response.templates
+        if template.name == "includes/post_card.html"
+    ]
+
+
+def test_post_card_fragment_cache(
+    user_client: Client, post_with_published_location, published_category
+):
+    assert card_renders(user_client.get("/")), (
+        "Убедитесь, что карточка публикации отрисовывается при пустом кеше."
+    )
+    assert not card_renders(user_client.get("/")), (
+        "Убедитесь, что повторный показ ленты берёт карточки публикаций"
+        " из кеша, а не отрисовывает их заново."
+    )
+
+    published_category.title = "Новое название категории"
+    published_category.save()
+    response = user_client.get("/")
+    assert card_renders(response) and (
+        published_category.title in response.content.decode("utf-8")
+    ), (
+        "Убедитесь, что кеш карточек сбрасывается при изменении категории"
+        " публикации."
+    )
+
+
+def test_versioned_timeout_is_bounded_in_process_cache(tmp_path):
+    from django.test import override_settings
+
+    from blog.caching import POST_CARD_TIMEOUT, versioned_timeout
+
+    with override_settings(BLOG_LOCAL_CACHE_TIMEOUT=30):
+        assert versioned_timeout(POST_CARD_TIMEOUT) == 30, (
+            "Убедитесь, что в кеше процесса карточки живут не дольше"
+            " BLOG_LOCAL_CACHE_TIMEOUT: другие процессы не видят смены"
+            " версий."
+        )
+    shared = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path),
+        }
+    }
+    with override_settings(CACHES=shared, BLOG_LOCAL_CACHE_TIMEOUT=30):
+        assert versioned_timeout(POST_CARD_TIMEOUT) == POST_CARD_TIMEOUT
+
+
+def test_anonymous_page_cache(
+    client: Client, user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    for url in ("/", f"/category/{post.category.slug}/", f"/posts/{post.id}/"):
+        assert client.get(url).templates, (
+            f"Убедитесь, что страница `{url}` отрисовывается при пустом кеше."
+        )
+        assert not client.get(url).templates, (
+            f"Убедитесь, что страница `{url}` отдаётся анонимам из кеша."
+        )
+        assert user_client.get(url).templates, (
+            f"Убедитесь, что страница `{url}` не берётся из кеша"
+            " для авторизованных пользователей."
+        )
+
+    post.title = "Исправленный заголовок"
+    post.save()
+    response = client.get(f"/posts/{post.id}/")
+    assert post.title in response.content.decode("utf-8"), (
+        "Убедитесь, что кеш страниц сбрасывается при изменении публикации."
+    )
+
+
+def test_conditional_get(client: Client, post_with_published_location):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), "Убедитесь, что страница публикации отдаёт заголовки ETag и Last-Modified."
+
+    not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert not_modified.status_code == 304 and not not_modified.templates, (
+        "Убедитесь, что на запрос с актуальным ETag страница публикации"
+        " отвечает 304 без отрисовки шаблона."
+    )
+
+    comment = post.comments.model(
+        post=post, author=post.author, text="Новый комментарий"
+    )
+    comment.save()
+    modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert modified.status_code == 200, (
+        "Убедитесь, что после нового комментария страница публикации"
+        " отдаётся заново."
+    )
+
+
+def test_conditional_get_hides_unpublished_post(
+    client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = client.get(url)["ETag"]
+    post.category.is_published = False
+    post.category.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 404, (
+        "Убедитесь, что пост из снятой категории не отвечает 304."
+    )
+    post.category.is_published = True
+    post.category.save()
+    post.is_published = False
+    post.save()
+    response = client.get(
+        url,
+        HTTP_IF_NONE_MATCH=etag,
+        HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT",
+    )
+    assert response.status_code == 404, (
+        "Убедитесь, что 304 не выдаёт существование скрытого поста."
+    )
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+def refreshed(category):
+    category.refresh_from_db()
+    return category.post_count, category.latest_pub_date
+
+
+def test_category_stats(
+    mixer: Mixer, user, published_category, another_category
+):
+    now = datetime.now(tz=pytz.UTC)
+    posts = mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=(now - timedelta(days=i + 1) for i in range(3)),
+    )
+    assert refreshed(published_category) == (3, posts[0].pub_date), (
+        "Убедитесь, что у категории ведутся число опубликованных постов"
+        " и дата последнего из них."
+    )
+
+    posts[0].is_published = False
+    posts[0].save()
+    assert refreshed(published_category) == (2, posts[1].pub_date), (
+        "Убедитесь, что снятый с публикации пост не учитывается в категории."
+    )
+    posts[1].category = another_category
+    posts[1].save()
+    assert refreshed(published_category) == (1, posts[2].pub_date)
+    assert refreshed(another_category) == (1, posts[1].pub_date), (
+        "Убедитесь, что при переносе поста меняются счётчики обеих категорий."
+    )
+    posts[2].delete()
+    assert refreshed(published_category) == (0, None), (
+        "Убедитесь, что удалённый пост не учитывается в категории."
+    )
+
+    delayed = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        pub_date=now + timedelta(days=1),
+    )
+    assert refreshed(published_category) == (0, None), (
+        "Убедитесь, что отложенный пост не учитывается до выхода."
+    )
+    # Время выхода наступило: сдвигаем даты в прошлое без сигналов.
+    type(published_category).objects.filter(pk=published_category.pk).update(
+        next_pub_date=now - timedelta(minutes=1)
+    )
+    delayed.pub_date = now - timedelta(minutes=1)
+    type(delayed).objects.filter(pk=delayed.pk).update(pub_date=delayed.pub_date)
+    (category,) = type(published_category).objects.filter(
+        pk=published_category.pk
+    ).with_current_stats()
+    assert (category.post_count, category.latest_pub_date) == (
+        1,
+        delayed.pub_date,
+    ), "Убедитесь, что вышедшая отложенная публикация учитывается при чтении."
+
+
+def test_categories_page(
+    user_client: Client, post_with_published_location, published_category
+):
+    response = user_client.get("/category/")
+    assert response.status_code == 200 and response.has_header(
+        "Last-Modified"
+    ), "Убедитесь, что страница `/category/` доступна и отдаёт Last-Modified."
+    category = response.context["categories"][0]
+    assert category.post_count == 1 and published_category.title in (
+        response.content.decode("utf-8")
+    ), "Убедитесь, что на странице категорий выводится число публикаций."
@@ -0,0 +1,41 @@
+import pytest
+from django.core.management import call_command
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comments(
+    user_client: Client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("первый", "второй"):
+        user_client.post(f"/posts/{post.id}/comment/", data={"text": text})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что счётчик комментариев публикации увеличивается"
+        " при добавлении комментария."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}/")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что счётчик комментариев публикации уменьшается"
+        " при удалении комментария."
+    )
+
+
+def test_rebuild_comment_counts(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post, is_published=True)
+    mixer.blend("blog.Comment", post=post, is_published=False)
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+    call_command("rebuild_comment_counts", chunk_size=1)
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        "Убедитесь, что команда `rebuild_comment_counts` исправляет"
+        " расхождения счётчика с числом опубликованных комментариев."
+    )
@@ -0,0 +1,24 @@
+import pytest
+from django.db import connection
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Проверяется настройка соединения с SQLite.",
+    ),
+]
+
+
+def test_sqlite_pragmas(settings):
+    with connection.cursor() as cursor:
+        for name in ("synchronous", "busy_timeout", "temp_store"):
+            cursor.execute(f"PRAGMA {name}")
+            value = str(cursor.fetchone()[0])
+            expected = str(settings.SQLITE_PRAGMAS[name])
+            assert value == {"NORMAL": "1", "MEMORY": "2"}.get(
+                expected, expected
+            ), (
+                f"Убедитесь, что соединение с SQLite настраивается"
+                f" по SQLITE_PRAGMAS: PRAGMA {name} = {value}."
+            )
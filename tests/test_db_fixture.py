@@ -0,0 +1,15 @@
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+
+from blog.models import Post
+
+DB_FIXTURE = Path(__file__).resolve().parent.parent / "blogicum" / "db.json"
+
+
+@pytest.mark.django_db
+def test_db_fixture_loads():
+    call_command("loaddata", str(DB_FIXTURE), verbosity=0)
+    assert Post.objects.filter(updated_at__isnull=False).count() == 39
+    assert not Post.objects.filter(excerpt="").exists()
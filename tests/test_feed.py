@@ -0,0 +1,125 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("synchronous_tasks"),
+]
+
+
+@pytest.fixture
+def author_posts(mixer: Mixer, another_user, published_category):
+    def blend(n, hours_ago=0):
+        now = datetime.now(tz=pytz.UTC)
+        return mixer.cycle(n).blend(
+            "blog.Post",
+            author=another_user,
+            category=published_category,
+            pub_date=(
+                now - timedelta(hours=hours_ago + i + 1) for i in range(n)
+            ),
+        )
+
+    return blend
+
+
+def feed_ids(client: Client):
+    ids = []
+    page_obj = client.get("/feed/").context["page_obj"]
+    while True:
+        assert len(page_obj) <= N_PER_PAGE
+        ids.extend(post.id for post in page_obj)
+        if not page_obj.next_cursor:
+            return ids
+        page_obj = client.get(
+            f"/feed/?cursor={page_obj.next_cursor}"
+        ).context["page_obj"]
+
+
+def test_follow_and_feed(
+    user, another_user, user_client: Client, author_posts
+):
+    from blog.models import TimelineEntry
+
+    old_posts = author_posts(3, hours_ago=100)
+    assert feed_ids(user_client) == []
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    assert feed_ids(user_client) == [post.id for post in old_posts], (
+        "Убедитесь, что после подписки в личной ленте появляются"
+        " последние публикации автора."
+    )
+
+    new_posts = author_posts(N_PER_PAGE + 2)
+    expected = [post.id for post in new_posts + old_posts]
+    assert TimelineEntry.objects.filter(user=user).count() == len(expected), (
+        "Убедитесь, что новые публикации раскладываются по лентам подписчиков."
+    )
+    assert feed_ids(user_client) == expected, (
+        "Убедитесь, что личная лента листается курсором от новых к старым."
+    )
+
+    new_posts[0].is_published = False
+    new_posts[0].save()
+    assert new_posts[0].id not in feed_ids(user_client), (
+        "Убедитесь, что снятая с публикации запись пропадает из лент."
+    )
+
+    user_client.post(f"/profile/{another_user.username}/unfollow/")
+    assert feed_ids(user_client) == [] and not TimelineEntry.objects.filter(
+        user=user
+    ).exists(), "Убедитесь, что после отписки лента очищается."
+
+
+def test_popular_author_feed(
+    settings, user, another_user, user_client: Client, author_posts
+):
+    from blog.models import AuthorStats, TimelineEntry
+
+    settings.BLOG_FANOUT_MAX_FOLLOWERS = 0
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    assert AuthorStats.objects.get(author=another_user).follower_count == 1
+    posts = author_posts(N_PER_PAGE + 2)
+    assert not TimelineEntry.objects.exists(), (
+        "Убедитесь, что посты авторов с множеством подписчиков"
+        " не раскладываются по лентам."
+    )
+    assert feed_ids(user_client) == [post.id for post in posts], (
+        "Убедитесь, что посты популярных авторов попадают в ленту при чтении."
+    )
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [["n"], ["n", "2024-01-01T00:00:00+00:00"], ["n", "x", 1], ["p", 1, 2]],
+)
+def test_malformed_cursor_is_not_found(user_client: Client, payload):
+    cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+    response = user_client.get(f"/feed/?cursor={cursor}")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_follow_changes_profile_etag_not_page_cache(
+    another_user, user_client: Client, author_posts
+):
+    from blog.caching import page_generation
+
+    author_posts(1)
+    url = f"/profile/{another_user.username}/"
+    etag = user_client.get(url)["ETag"]
+    generation = page_generation()
+    user_client.post(f"/profile/{another_user.username}/follow/")
+    assert page_generation() == generation, (
+        "Подписка не должна сбрасывать кеш страниц для анонимов."
+    )
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert "Отписаться" in response.content.decode()
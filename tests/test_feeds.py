@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("synchronous_tasks"),
+]
+
+
+@pytest.fixture
+def feed_posts(mixer: Mixer, user, published_category):
+    now = datetime.now(tz=pytz.UTC)
+    return mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=i + 1) for i in range(3)),
+    )
+
+
+@pytest.mark.parametrize(
+    "fmt, content_type, marker",
+    [
+        ("rss", "application/rss+xml", b"<rss"),
+        ("atom", "application/atom+xml", b"<feed"),
+    ],
+)
+def test_feed_formats(
+    client: Client, feed_posts, fmt, content_type, marker
+):
+    response = client.get(f"/feeds/{fmt}/")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"].startswith(content_type)
+    assert marker in response.content
+    for post in feed_posts:
+        assert post.title.encode() in response.content
+    assert response["ETag"] and response["Last-Modified"]
+
+
+def test_feed_conditional_get(client: Client, feed_posts):
+    response = client.get("/feeds/rss/")
+    repeated = client.get(
+        "/feeds/rss/", HTTP_IF_NONE_MATCH=response["ETag"]
+    )
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        "Убедитесь, что лента отвечает 304 на запрос с актуальным ETag."
+    )
+    repeated = client.get(
+        "/feeds/rss/", HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_feed_served_from_cache(
+    client: Client, feed_posts, django_assert_num_queries
+):
+    client.get("/feeds/atom/")
+    with django_assert_num_queries(0):
+        response = client.get("/feeds/atom/")
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_feed_invalidated_on_unpublish(client: Client, feed_posts):
+    hidden = feed_posts[0]
+    etag = client.get("/feeds/rss/")["ETag"]
+    hidden.is_published = False
+    hidden.save()
+    response = client.get("/feeds/rss/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что лента сбрасывается при снятии поста с публикации."
+    )
+    assert hidden.title.encode() not in response.content
+    assert feed_posts[1].title.encode() in response.content
+
+
+def test_feed_prerendered_after_invalidation(
+    client: Client, feed_posts, django_assert_num_queries
+):
+    client.get("/feeds/rss/")
+    feed_posts[0].title = "Новый заголовок"
+    feed_posts[0].save()
+    with django_assert_num_queries(0):
+        response = client.get("/feeds/rss/")
+    assert "Новый заголовок".encode() in response.content
+    link = f"https://example.com/posts/{feed_posts[0].id}/"
+    assert link.encode() in response.content, (
+        "Ссылки ленты, перерисованной в фоне, строятся от адреса сайта."
+    )
+
+
+def test_scoped_feeds(
+    client: Client, mixer: Mixer, user, another_user, feed_posts
+):
+    category = feed_posts[0].category
+    other = mixer.blend(
+        "blog.Post",
+        author=another_user,
+        is_published=True,
+        category__is_published=True,
+        pub_date=datetime.now(tz=pytz.UTC) - timedelta(days=1),
+    )
+    category_feed = client.get(f"/feeds/category/{category.slug}/rss/")
+    author_feed = client.get(f"/feeds/author/{another_user.username}/atom/")
+    for response in (category_feed, author_feed):
+        assert response.status_code == HTTPStatus.OK
+    assert feed_posts[0].title.encode() in category_feed.content
+    assert other.title.encode() not in category_feed.content
+    assert other.title.encode() in author_feed.content
+    assert feed_posts[0].title.encode() not in author_feed.content
+
+    category.is_published = False
+    category.save()
+    response = client.get(f"/feeds/category/{category.slug}/rss/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert client.get("/feeds/json/").status_code == HTTPStatus.NOT_FOUND
+
+
+def test_feeds_refreshed_on_author_and_category_rename(
+    client: Client, user, feed_posts
+):
+    category = feed_posts[0].category
+    all_feed = "/feeds/rss/"
+    category_feed = f"/feeds/category/{category.slug}/rss/"
+    author_feed = f"/feeds/author/{user.username}/rss/"
+    for url in (all_feed, category_feed, author_feed):
+        client.get(url)
+
+    user.username = "renamed_author"
+    user.save()
+    for url in (all_feed, category_feed):
+        assert "renamed_author" in client.get(url).content.decode("utf-8"), (
+            f"Убедитесь, что лента `{url}` сбрасывается при смене имени"
+            " автора её постов."
+        )
+
+    author_feed = "/feeds/author/renamed_author/rss/"
+    client.get(author_feed)
+    category.title = "Переименованная категория"
+    category.save()
+    for url in (all_feed, author_feed):
+        assert category.title in client.get(url).content.decode("utf-8"), (
+            f"Убедитесь, что лента `{url}` сбрасывается при смене"
+            " названия категории её постов."
+        )
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import pytest
+import pytz
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import Client
+from mixer.backend.django import Mixer
+from PIL import Image
+
+pytestmark = [pytest.mark.django_db]
+
+
+def jpeg_upload(name="photo.jpg", size=(2000, 1000)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "teal").save(buffer, "JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), "image/jpeg")
+
+
+@pytest.fixture
+def image_post(mixer: Mixer, user, published_category):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=datetime.now(tz=pytz.UTC) - timedelta(hours=1),
+    )
+    post.image = jpeg_upload()
+    post.save()
+    return post
+
+
+def test_variants_built_after_upload(
+    image_post, media_root, synchronous_tasks
+):
+    image_post.image = jpeg_upload("second.jpg")
+    image_post.save()
+    image_post.refresh_from_db()
+    assert image_post.image_variants["source"] == image_post.image.name
+    variants = image_post.image_variants["variants"]
+    assert {
+        kind: (variant["width"], variant["height"])
+        for kind, variant in variants.items()
+    } == {
+        "thumb": (320, 160),
+        "detail": (640, 320),
+        "detail_2x": (1280, 640),
+    }
+    for variant in variants.values():
+        with Image.open(media_root / variant["name"]) as image:
+            assert image.size == (variant["width"], variant["height"])
+
+    old_files = [media_root / variant["name"] for variant in variants.values()]
+    image_post.image = jpeg_upload("third.jpg", size=(200, 100))
+    image_post.save()
+    assert not any(path.exists() for path in old_files), (
+        "Убедитесь, что копии заменённого фото удаляются."
+    )
+    image_post.refresh_from_db()
+    assert {
+        variant["width"]
+        for variant in image_post.image_variants["variants"].values()
+    } == {200}, "Фото меньше нужной ширины не должно растягиваться."
+
+
+def test_templates_fall_back_to_original(
+    user_client: Client, image_post
+):
+    response = user_client.get(f"/posts/{image_post.id}/")
+    content = response.content.decode()
+    assert image_post.image.url in content
+    assert "srcset" not in content
+
+
+def test_templates_use_variants(
+    user_client: Client, image_post, synchronous_tasks
+):
+    from blog.images import build_variants
+
+    build_variants(image_post.id)
+    card = user_client.get("/").content.decode()
+    assert "-320w.jpg" in card and 'width="320"' in card
+    assert 'srcset="' in card and "1280w" in card
+    detail = user_client.get(f"/posts/{image_post.id}/").content.decode()
+    assert 'width="640" height="320"' in detail
+    assert f'href="{image_post.image.url}"' in detail
+
+
+def test_missing_file_does_not_break_saving(
+    mixer: Mixer, user, published_category, synchronous_tasks
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        image="birthdays_images/missing.jpg",
+    )
+    post.refresh_from_db()
+    assert post.image_variants == {}
+
+
+def test_upload_is_normalized(
+    settings, image_post, media_root, synchronous_tasks
+):
+    from blog.models import NormalizedImage
+
+    settings.BLOG_IMAGE_MAX_SIZE = (1000, 1000)
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 30000
+    buffer = BytesIO()
+    Image.new("RGB", (3000, 1500), "teal").save(
+        buffer, "JPEG", quality=100, exif=exif
+    )
+    image_post.image = SimpleUploadedFile("big.jpg", buffer.getvalue())
+    image_post.save()
+    original = media_root / image_post.image.name
+    image_post.refresh_from_db()
+    assert not original.exists(), "Исходник после обработки не нужен."
+    record = NormalizedImage.objects.get(name=image_post.image.name)
+    assert record.original_size == len(buffer.getvalue())
+    assert record.size < record.original_size
+    with Image.open(media_root / image_post.image.name) as image:
+        assert image.size == (record.width, record.height) == (1000, 500)
+        assert image.info.get("progressive")
+        assert not image.getexif(), "Метаданные нужно удалить."
+    assert image_post.image_variants["source"] == image_post.image.name
+
+
+def test_transparent_upload_keeps_alpha_without_metadata(
+    image_post, media_root, synchronous_tasks
+):
+    exif = Image.Exif()
+    exif[0x010E] = "secret"
+    buffer = BytesIO()
+    Image.new("RGBA", (300, 200), (0, 128, 128, 100)).save(
+        buffer, "PNG", exif=exif
+    )
+    image_post.image = SimpleUploadedFile("alpha.png", buffer.getvalue())
+    image_post.save()
+    image_post.refresh_from_db()
+    assert image_post.image.name.endswith(".png")
+    with Image.open(media_root / image_post.image.name) as image:
+        assert (image.format, image.mode) == ("PNG", "RGBA")
+        assert not image.getexif(), "Метаданные нужно удалить и из PNG."
+
+
+def test_smaller_original_is_kept(settings, image_post, synchronous_tasks):
+    from blog.models import NormalizedImage
+
+    settings.BLOG_IMAGE_QUALITY = 95
+    buffer = BytesIO()
+    noise = Image.effect_noise((400, 300), 64).convert("RGB")
+    noise.save(buffer, "JPEG", quality=40)
+    image_post.image = SimpleUploadedFile("small.jpg", buffer.getvalue())
+    image_post.save()
+    source = image_post.image.name
+    image_post.refresh_from_db()
+    assert image_post.image.name == source, (
+        "Пережатое фото больше исходного — оставьте исходное."
+    )
+    original_size, size = NormalizedImage.objects.savings()
+    assert original_size == size
@@ -0,0 +1,106 @@
+import pytest
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+def selects_from(client: Client, url, table):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and query["sql"].split(" FROM ", 1)[-1].startswith(table)
+    ]
+
+
+def test_category_and_user_lookup_cache(
+    user, user_client: Client, published_category
+):
+    from blog.lookups import lookup_cache_stats
+
+    for url, table in (
+        (f"/category/{published_category.slug}/", '"blog_category"'),
+        (f"/profile/{user.username}/", '"auth_user"'),
+    ):
+        _, first = selects_from(user_client, url, table)
+        assert first, f"Убедитесь, что страница `{url}` доступна."
+        response, second = selects_from(user_client, url, table)
+        assert response.status_code == 200 and len(second) < len(first), (
+            f"Убедитесь, что страница `{url}` при повторном запросе берёт"
+            " объект из URL из кеша процесса."
+        )
+    stats = lookup_cache_stats()
+    assert all(
+        counters["hits"] >= 1 and counters["misses"] >= 1
+        for counters in stats.values()
+    ), "Убедитесь, что кеш считает попадания и промахи."
+
+    published_category.is_published = False
+    published_category.save()
+    response = user_client.get(f"/category/{published_category.slug}/")
+    assert response.status_code == 404, (
+        "Убедитесь, что кеш категорий сбрасывается при их изменении."
+    )
+
+
+def test_stale_cached_category_is_not_found(
+    user_client: Client, published_category
+):
+    from blog.models import Category
+
+    url = f"/category/{published_category.slug}/"
+    assert user_client.get(url).status_code == 200
+    # Другой процесс снимает категорию с публикации: сигналы этого
+    # процесса не срабатывают, и кеш всё ещё помнит категорию.
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=False
+    )
+    assert user_client.get(url).status_code == 404, (
+        "Убедитесь, что категория из кеша процесса перепроверяется"
+        " по базе."
+    )
+    Category.objects.filter(pk=published_category.pk).update(
+        is_published=True
+    )
+    assert user_client.get(url).status_code == 200
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "DELETE FROM blog_category WHERE id = %s", [published_category.pk]
+        )
+    assert user_client.get(url).status_code == 404
+
+
+def test_lru_cache_is_bounded():
+    from blog.lookups import LRUCache
+
+    lru = LRUCache("тест", maxsize=2, timeout=60)
+    for key in "abc":
+        lru.set(key, key)
+    assert lru.get("a") is None and lru.get("c") == "c", (
+        "Убедитесь, что при переполнении кеш вытесняет давнюю запись."
+    )
+    assert lru.stats()["size"] == 2
+
+
+def test_lru_cache_logs_hits_and_returns_copies(
+    monkeypatch, caplog, published_category
+):
+    from blog import lookups
+
+    monkeypatch.setattr(lookups, "STATS_LOG_EVERY", 3)
+    lru = lookups.LRUCache("тест", maxsize=2, timeout=60)
+    lru.set("slug", published_category)
+    with caplog.at_level("INFO", logger="blog.lookups"):
+        copies = [lru.get("slug") for _ in range(3)]
+    assert "Кеш тест" in caplog.text, (
+        "Убедитесь, что статистика пишется и при одних попаданиях."
+    )
+    copies[0].title = "Изменено"
+    assert lru.get("slug").title == published_category.title, (
+        "Убедитесь, что кеш отдаёт копии объектов."
+    )
+    assert copies[1] is not copies[2]
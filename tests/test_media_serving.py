@@ -0,0 +1,96 @@
+import hashlib
+from http import HTTPStatus
+
+import pytest
+from django.core.files.base import ContentFile
+from django.test.client import Client
+
+pytestmark = [pytest.mark.django_db]
+
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def serving_settings(settings):
+    settings.BLOG_MEDIA_ACCEL = None
+    settings.DEBUG = True
+    # Панель отладки при DEBUG не нужна: её адреса подключаются не всегда.
+    settings.INTERNAL_IPS = []
+
+
+@pytest.fixture
+def stored_name(media_root):
+    from django.core.files.storage import default_storage
+
+    return default_storage.save("birthdays_images/a.png", ContentFile(CONTENT))
+
+
+def test_content_addressed_file_is_immutable(client: Client, stored_name):
+    response = client.get(f"/media/{stored_name}")
+    assert response.status_code == HTTPStatus.OK
+    assert b"".join(response.streaming_content) == CONTENT
+    assert response["Content-Type"] == "image/png"
+    assert "immutable" in response["Cache-Control"]
+    etag = response["ETag"]
+    assert etag == f'"{hashlib.sha256(CONTENT).hexdigest()}"'
+    again = client.get(f"/media/{stored_name}", HTTP_IF_NONE_MATCH=etag)
+    assert again.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_range_requests(client: Client, stored_name):
+    url = f"/media/{stored_name}"
+    response = client.get(url, HTTP_RANGE="bytes=0-9")
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    assert b"".join(response.streaming_content) == CONTENT[:10]
+    assert response["Content-Range"] == f"bytes 0-9/{len(CONTENT)}"
+    response = client.get(url, HTTP_RANGE="bytes=-16")
+    assert b"".join(response.streaming_content) == CONTENT[-16:]
+    response = client.get(url, HTTP_RANGE=f"bytes={len(CONTENT)}-")
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response["Content-Range"] == f"bytes */{len(CONTENT)}"
+    response = client.get(url, HTTP_RANGE="bytes=5-3")
+    assert response.status_code == HTTPStatus.OK, (
+        "Неверный диапазон нужно игнорировать, а не отвечать 416."
+    )
+    response = client.get(
+        url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        "Устаревший If-Range должен отдавать файл целиком."
+    )
+
+
+def test_accel_redirect_hands_file_to_front_server(
+    settings, client: Client, stored_name
+):
+    settings.BLOG_MEDIA_ACCEL = "x-accel-redirect"
+    settings.DEBUG = False
+    response = client.get(f"/media/{stored_name}")
+    assert response.status_code == HTTPStatus.OK
+    assert response["X-Accel-Redirect"] == f"/protected-media/{stored_name}"
+    assert response.content == b"", "Django не должен отдавать байты файла."
+    assert "immutable" in response["Cache-Control"]
+
+
+def test_python_never_streams_media_in_production(
+    settings, client: Client, stored_name
+):
+    settings.DEBUG = False
+    response = client.get(f"/media/{stored_name}")
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Без BLOG_MEDIA_ACCEL файлы отдаются приложением только при DEBUG."
+    )
+
+
+def test_hidden_and_outside_paths_are_not_served(
+    client: Client, media_root, stored_name
+):
+    (media_root / ".incoming").mkdir(exist_ok=True)
+    (media_root / ".incoming" / "upload").write_bytes(CONTENT)
+    for url in (
+        "/media/.incoming/upload",
+        "/media/../manage.py",
+        "/media/birthdays_images/",
+        "/media/birthdays_images/missing.png",
+    ):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND, url
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import re
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from mixer.backend.django import Mixer
+from PIL import Image
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("synchronous_tasks"),
+]
+
+
+@pytest.fixture(autouse=True)
+def storage_settings(settings):
+    settings.BLOG_MEDIA_CHUNK_SIZE = 1024
+    settings.BLOG_IMAGE_NORMALIZE = False
+
+
+def png_bytes(color="teal"):
+    buffer = BytesIO()
+    Image.new("RGB", (64, 32), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_storage_names_files_by_content(media_root):
+    from django.core.files.storage import default_storage
+
+    content = png_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    name = default_storage.save(
+        "birthdays_images/Photo.PNG", ContentFile(content)
+    )
+    assert name == f"birthdays_images/{digest[:2]}/{digest[2:4]}/{digest}.png"
+    assert (media_root / name).read_bytes() == content
+    again = default_storage.save(
+        "birthdays_images/copy.png", ContentFile(content)
+    )
+    assert again == name, "Одинаковое содержимое должно храниться один раз."
+    assert not list((media_root / ".incoming").iterdir()), (
+        "Убедитесь, что временные файлы загрузки не остаются на диске."
+    )
+
+
+def test_identical_uploads_share_one_counted_file(
+    mixer: Mixer, user, published_category, media_root
+):
+    from blog.models import MediaFile
+
+    content = png_bytes()
+    posts = []
+    for filename in ("first.png", "second.png"):
+        post = mixer.blend(
+            "blog.Post", author=user, category=published_category
+        )
+        post.image = SimpleUploadedFile(filename, content, "image/png")
+        post.save()
+        posts.append(post)
+    assert posts[0].image.name == posts[1].image.name
+    assert re.fullmatch(
+        r"birthdays_images/[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.png",
+        posts[0].image.name,
+    )
+    stored = MediaFile.objects.get(name=posts[0].image.name)
+    assert (stored.ref_count, stored.size) == (2, len(content))
+    path = media_root / stored.name
+
+    posts[0].delete()
+    assert path.exists(), "Файл, на который ещё ссылаются, нужно сохранить."
+    assert MediaFile.objects.get(name=stored.name).ref_count == 1
+
+    posts[1].image = SimpleUploadedFile("other.png", png_bytes("red"))
+    posts[1].save()
+    assert not path.exists(), "Файл без ссылок нужно удалить."
+    assert not MediaFile.objects.filter(name=stored.name).exists()
+    assert MediaFile.objects.get(name=posts[1].image.name).ref_count == 1
+
+
+def test_sweep_media_removes_only_orphans(
+    mixer: Mixer, user, published_category, media_root
+):
+    from django.core.management import call_command
+
+    post = mixer.blend("blog.Post", author=user, category=published_category)
+    post.image = SimpleUploadedFile("kept.png", png_bytes(), "image/png")
+    post.save()
+    post.refresh_from_db()
+    kept = [media_root / post.image.name] + [
+        media_root / variant["name"]
+        for variant in post.image_variants["variants"].values()
+    ]
+    orphans = {
+        "birthdays_images/ab/cd/orphan.png": b"x" * 100,
+        "variants/birthdays_images/ab/cd/orphan-320w.png": b"x" * 20,
+        ".incoming/aborted": b"x" * 5,
+    }
+    for name, content in orphans.items():
+        path = media_root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+    fresh = media_root / "birthdays_images/fresh.png"
+    fresh.write_bytes(b"new")
+    old = time.time() - 2 * 60 * 60
+    for path in [*kept, *(media_root / name for name in orphans)]:
+        os.utime(path, (old, old))
+
+    out = StringIO()
+    call_command("sweep_media", "--dry-run", "--chunk-size=2", stdout=out)
+    assert "файлов: 3, освобождается байт: 125" in out.getvalue()
+    assert all((media_root / name).exists() for name in orphans)
+
+    out = StringIO()
+    call_command("sweep_media", "--chunk-size=2", stdout=out)
+    assert "Удалено файлов: 3" in out.getvalue()
+    assert not any((media_root / name).exists() for name in orphans)
+    assert all(path.exists() for path in kept), (
+        "Фото публикации и его копии удалять нельзя."
+    )
+    assert fresh.exists(), "Свежие загрузки сборщик трогать не должен."
+
+
+def test_reupload_survives_pending_delete(media_root):
+    from django.core.files.storage import default_storage
+
+    from blog.media import acquire_media, delete_unreferenced
+    from blog.models import MediaFile
+
+    content = png_bytes()
+    name = default_storage.save("birthdays_images/a.png", ContentFile(content))
+    acquire_media(name)
+    MediaFile.objects.filter(name=name).change_ref_count(-1)
+    released_at = time.time()
+    old = released_at - 60
+    os.utime(media_root / name, (old, old))
+    assert default_storage.save(
+        "birthdays_images/again.png", ContentFile(content)
+    ) == name
+    delete_unreferenced(name, released_at)
+    assert (media_root / name).exists(), (
+        "Файл, загруженный заново до удаления, удалять нельзя."
+    )
+    acquire_media(name)
+    assert MediaFile.objects.get(name=name).ref_count == 1
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+N_PAGES = 7
+
+
+@pytest.fixture
+def deep_feed(mixer: Mixer, user, published_location, published_category):
+    now = datetime.now(tz=pytz.UTC)
+    return mixer.cycle(N_PER_PAGE * N_PAGES).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(hours=i) for i in range(10**6)),
+    )
+
+
+def test_cursor_pagination(user_client: Client, deep_feed):
+    from blog.paginators import PAGE_NUMBER_LIMIT
+
+    expected_ids = [
+        post.id
+        for post in sorted(deep_feed, key=lambda p: p.pub_date, reverse=True)
+    ]
+    response = user_client.get(f"/?page={PAGE_NUMBER_LIMIT}")
+    page_obj = response.context["page_obj"]
+    assert page_obj.next_cursor, (
+        "Убедитесь, что с последней нумерованной страницы ленты"
+        " следующая страница открывается по курсору."
+    )
+    seen_ids = [
+        post.id
+        for number in range(1, PAGE_NUMBER_LIMIT + 1)
+        for post in user_client.get(f"/?page={number}").context["page_obj"]
+    ]
+
+    cursor = page_obj.next_cursor
+    previous_cursor = None
+    while cursor:
+        page_obj = user_client.get(f"/?cursor={cursor}").context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE
+        if previous_cursor is None:
+            previous_cursor = page_obj.previous_cursor
+        seen_ids.extend(post.id for post in page_obj)
+        cursor = page_obj.next_cursor
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что курсорная пагинация выдаёт все публикации"
+        " по одному разу в порядке «от новых к старым»."
+    )
+
+    page_obj = user_client.get(f"/?cursor={previous_cursor}").context["page_obj"]
+    assert [post.id for post in page_obj] == expected_ids[
+        (PAGE_NUMBER_LIMIT - 1) * N_PER_PAGE:PAGE_NUMBER_LIMIT * N_PER_PAGE
+    ], "Убедитесь, что курсор на предыдущую страницу ведёт назад по ленте."
+
+
+def test_invalid_cursor(client: Client):
+    response = client.get("/?cursor=not-a-cursor")
+    assert response.status_code == 404, (
+        "Убедитесь, что для некорректного курсора возвращается ошибка 404."
+    )
+
+
+def test_comments_cursor_pagination(
+    mixer: Mixer, user_client: Client, post_with_published_location
+):
+    from blog.views import COMMENTS_PER_PAGE
+
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENTS_PER_PAGE * 2 + 5).blend(
+        "blog.Comment", post=post
+    )
+    response = user_client.get(f"/posts/{post.id}/")
+    page = response.context["comments"]
+    assert len(page) == COMMENTS_PER_PAGE and page.has_next(), (
+        "Убедитесь, что на странице публикации выводится только первая"
+        " страница комментариев со ссылкой на продолжение."
+    )
+    seen_ids = [comment.id for comment in page]
+    cursor = page.next_cursor
+    while cursor:
+        data = user_client.get(
+            f"/posts/{post.id}/comments/?cursor={cursor}&format=json"
+        ).json()
+        seen_ids.extend(comment["id"] for comment in data["comments"])
+        cursor = data["next_cursor"]
+    expected_ids = [
+        comment.id
+        for comment in sorted(comments, key=lambda c: (c.created_at, c.id))
+    ]
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что комментарии догружаются по курсору"
+        " по одному разу в порядке добавления."
+    )
+    fragment = user_client.get(
+        f"/posts/{post.id}/comments/?cursor={page.next_cursor}"
+    )
+    assert f"comment_{expected_ids[COMMENTS_PER_PAGE]}" in (
+        fragment.content.decode("utf-8")
+    ), "Убедитесь, что без format=json отдаётся HTML-фрагмент комментариев."
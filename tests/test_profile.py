@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from django.db import connection
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+from mixer.backend.django import Mixer
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def profile_posts(mixer: Mixer, user, published_location, published_category):
+    now = datetime.now(tz=pytz.UTC)
+    posts = mixer.cycle(25).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        pub_date=(now - timedelta(hours=i + 1) for i in range(10**6)),
+    )
+    hidden, delayed = posts[:2]
+    hidden.is_published = False
+    hidden.save()
+    delayed.pub_date = now + timedelta(days=1)
+    delayed.save()
+    return posts
+
+
+def profile_ids(client: Client, user):
+    ids = []
+    page = 1
+    while True:
+        page_obj = client.get(
+            f"/profile/{user.username}/?page={page}"
+        ).context["page_obj"]
+        ids.extend(post.id for post in page_obj)
+        if not page_obj.has_next():
+            return ids
+        page += 1
+
+
+def test_profile_visibility(
+    user, user_client: Client, another_user_client: Client, profile_posts
+):
+    hidden, delayed = profile_posts[:2]
+    visitor_ids = profile_ids(another_user_client, user)
+    assert len(visitor_ids) == len(profile_posts) - 2 and not (
+        {hidden.id, delayed.id} & set(visitor_ids)
+    ), (
+        "Убедитесь, что на странице чужого профиля не видны"
+        " снятые с публикации и отложенные публикации."
+    )
+    assert set(profile_ids(user_client, user)) == {
+        post.id for post in profile_posts
+    }, "Убедитесь, что автор видит в своём профиле все свои публикации."
+
+
+def test_owner_profile_uses_stored_post_count(
+    user, user_client: Client, profile_posts
+):
+    from blog.models import AuthorStats
+
+    assert AuthorStats.objects.get(author=user).post_count == len(
+        profile_posts
+    ), "Убедитесь, что число публикаций автора ведётся при их добавлении."
+    profile_posts[-1].delete()
+    assert AuthorStats.objects.get(author=user).post_count == len(
+        profile_posts
+    ) - 1, "Убедитесь, что число публикаций автора ведётся при их удалении."
+
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f"/profile/{user.username}/?page=2")
+    assert response.context["page_obj"].paginator.num_pages == 3
+    counts = [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT COUNT(*)")
+        and '"blog_post"' in query["sql"]
+    ]
+    assert not counts, (
+        "Убедитесь, что страницы своего профиля считаются по сохранённому"
+        " числу публикаций, без COUNT(*). Запросы:\n" + "\n".join(counts)
+    )
@@ -0,0 +1,136 @@
+import re
+
+import pytest
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite",
+        reason="Проверяется план запроса SQLite.",
+    ),
+]
+
+FULL_SCAN = re.compile(r"\bSCAN blog_post\b(?! USING)")
+TEMP_SORT = re.compile(r"USE TEMP B-TREE")
+
+
+def get_feed_queryset(view_name, user=None, **kwargs):
+    from blog import views
+
+    request = RequestFactory().get("/")
+    request.user = user or AnonymousUser()
+    view = getattr(views, view_name)()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def assert_plan_uses_index(queryset, page_name):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f"Убедитесь, что запрос ленты {page_name} не читает таблицу"
+        f" публикаций целиком. План запроса:\n{plan}"
+    )
+    assert not TEMP_SORT.search(plan), (
+        f"Убедитесь, что запрос ленты {page_name} сортируется по индексу,"
+        f" а не во временном B-дереве. План запроса:\n{plan}"
+    )
+
+
+@pytest.fixture
+def feed_querysets(user, published_category):
+    return {
+        "главной страницы": get_feed_queryset("PostListView"),
+        "категории": get_feed_queryset(
+            "CategoryListView", slug=published_category.slug
+        ),
+        "профиля (гость)": get_feed_queryset(
+            "ProfileDetailView", username=user.username
+        ),
+        "профиля (автор)": get_feed_queryset(
+            "ProfileDetailView", user=user, username=user.username
+        ),
+        "архива за месяц": get_feed_queryset(
+            "PostArchiveView", year=2023, month=5
+        ),
+    }
+
+
+def test_feed_query_plans(feed_querysets):
+    for page_name, queryset in feed_querysets.items():
+        assert_plan_uses_index(queryset[:10], page_name)
+
+
+def test_cursor_page_query_plans(feed_querysets):
+    from blog.paginators import CursorPaginator
+
+    for page_name, queryset in feed_querysets.items():
+        paginator = CursorPaginator(queryset, 10)
+        for newer in (False, True):
+            ordering = ("pub_date", "id") if newer else ("-pub_date", "-id")
+            assert_plan_uses_index(
+                queryset.filter(paginator._seek([timezone.now(), 1], newer))
+                .order_by(*ordering)[:11],
+                page_name,
+            )
+
+
+def test_feed_queries_skip_post_text(feed_querysets):
+    for page_name, queryset in feed_querysets.items():
+        assert '"blog_post"."text"' not in str(queryset.query), (
+            f"Убедитесь, что запрос ленты {page_name} не читает полный"
+            " текст публикаций: карточке достаточно анонса."
+        )
+
+
+@pytest.mark.parametrize("n_comments", [1, 25])
+def test_post_detail_query_count(
+    mixer, user_client, post_with_published_location, n_comments
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f"/posts/{post.id}/")
+    assert response.status_code == 200
+    sql = [query["sql"] for query in queries]
+    assert len(sql) == 4, (
+        "Убедитесь, что страница публикации загружает пост со связанными"
+        " объектами и комментарии с авторами двумя запросами (плюс сессия"
+        " и пользователь), независимо от числа комментариев. Запросы:\n"
+        + "\n".join(sql)
+    )
+
+
+def test_redact_views_fetch_object_once(
+    user_client, post_with_published_location, comment_to_a_post
+):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    post = post_with_published_location
+    comment_to_a_post.author = post.author
+    comment_to_a_post.save()
+    for url, table in (
+        (f"/posts/{post.id}/edit/", '"blog_post"'),
+        (f"/posts/{post.id}/delete/", '"blog_post"'),
+        (f"/posts/{post.id}/edit_comment/{comment_to_a_post.id}/", '"blog_comment"'),
+        (f"/posts/{post.id}/delete_comment/{comment_to_a_post.id}/", '"blog_comment"'),
+    ):
+        with CaptureQueriesContext(connection) as queries:
+            assert user_client.get(url).status_code == 200
+        selects = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT") and f"FROM {table}" in query["sql"]
+        ]
+        assert len(selects) == 1, (
+            f"Убедитесь, что страница `{url}` выбирает редактируемый объект"
+            " один раз и проверяет автора по author_id. Запросы:\n"
+            + "\n".join(selects)
+        )
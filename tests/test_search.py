@@ -0,0 +1,95 @@
+from datetime import datetime, timedelta
+
+import pytest
+import pytz
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer: Mixer, user, published_location, published_category):
+    now = datetime.now(tz=pytz.UTC)
+    return mixer.cycle(N_PER_PAGE * 2 + 3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        location=published_location,
+        title=(f"Поход в горы №{i}" for i in range(10**6)),
+        text="Рассказ о путешествии.",
+        pub_date=(now - timedelta(hours=i + 1) for i in range(10**6)),
+    )
+
+
+def search_ids(client: Client, query):
+    ids = []
+    response = client.get("/search/", {"q": query})
+    assert response.status_code == 200, (
+        "Убедитесь, что страница поиска `/search/` доступна."
+    )
+    page_obj = response.context["page_obj"]
+    ids.extend(post.id for post in page_obj)
+    while page_obj.next_cursor:
+        page_obj = client.get(
+            "/search/", {"q": query, "cursor": page_obj.next_cursor}
+        ).context["page_obj"]
+        assert len(page_obj) <= N_PER_PAGE
+        ids.extend(post.id for post in page_obj)
+    return ids
+
+
+def test_search(mixer: Mixer, user_client: Client, searchable_posts):
+    expected = {post.id for post in searchable_posts}
+    found = search_ids(user_client, "горы")
+    assert len(found) == len(expected) and set(found) == expected, (
+        "Убедитесь, что поиск находит публикации по слову из заголовка"
+        " и курсор выдаёт каждую ровно один раз."
+    )
+    assert set(search_ids(user_client, "путешеств")) == expected, (
+        "Убедитесь, что поиск находит публикации по началу слова из текста."
+    )
+
+    title_match = mixer.blend(
+        "blog.Post",
+        author=searchable_posts[0].author,
+        category=searchable_posts[0].category,
+        location=searchable_posts[0].location,
+        pub_date=searchable_posts[-1].pub_date,
+        title="Путешествие",
+        text="Без подробностей.",
+    )
+    assert search_ids(user_client, "путешествие")[0] == title_match.id, (
+        "Убедитесь, что совпадение в заголовке ранжируется выше,"
+        " чем в тексте."
+    )
+
+    hidden, deleted, edited = searchable_posts[:3]
+    hidden.is_published = False
+    hidden.save()
+    deleted.delete()
+    edited.title = "Море"
+    edited.save()
+    found = set(search_ids(user_client, "горы"))
+    assert not {hidden.id, deleted.id, edited.id} & found, (
+        "Убедитесь, что поиск выдаёт только опубликованные публикации"
+        " и учитывает их правку и удаление."
+    )
+    assert search_ids(user_client, "море") == [edited.id]
+
+
+def test_search_query_syntax(user_client: Client, searchable_posts):
+    for query in ('"горы', "горы OR", "NEAR(", "*", ""):
+        response = user_client.get("/search/", {"q": query})
+        assert response.status_code == 200, (
+            "Убедитесь, что поиск не падает на спецсимволах FTS5 в запросе."
+        )
+
+
+def test_admin_search(admin_client: Client, searchable_posts):
+    response = admin_client.get("/admin/blog/post/", {"q": "горы"})
+    assert response.status_code == 200 and response.context["cl"].result_count == len(
+        searchable_posts
+    ), "Убедитесь, что поиск в админке публикаций идёт по полнотекстовому индексу."
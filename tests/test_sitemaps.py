@@ -0,0 +1,162 @@
+import os
+import time
+from datetime import datetime, timedelta
+from http import HTTPStatus
+
+import pytest
+import pytz
+from django.contrib.sites.models import Site
+from django.test.client import Client
+from mixer.backend.django import Mixer
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("synchronous_tasks"),
+]
+
+CHUNK_SIZE = 2
+
+
+@pytest.fixture(autouse=True)
+def sitemap_settings(settings, tmp_path):
+    settings.BLOG_SITEMAP_ROOT = tmp_path / "sitemaps"
+    settings.BLOG_SITEMAP_CHUNK_SIZE = CHUNK_SIZE
+    settings.BLOG_SITE_SCHEME = "https"
+    Site.objects.filter(pk=settings.SITE_ID).update(domain="blogicum.test")
+    Site.objects.clear_cache()
+    return settings.BLOG_SITEMAP_ROOT
+
+
+@pytest.fixture
+def sitemap_posts(mixer: Mixer, user, published_category):
+    now = datetime.now(tz=pytz.UTC)
+    return mixer.cycle(5).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=i + 1) for i in range(5)),
+    )
+
+
+def post_chunk(post):
+    return f"sitemap-posts-{(post.id - 1) // CHUNK_SIZE}.xml"
+
+
+def post_loc(post):
+    return f"<loc>https://blogicum.test/posts/{post.id}/</loc>".encode()
+
+
+def get_file(client: Client, name):
+    response = client.get(f"/sitemaps/{name}")
+    assert response.status_code == HTTPStatus.OK
+    return b"".join(response.streaming_content)
+
+
+def test_sitemap_index_and_chunks(
+    client: Client, sitemap_posts, user, published_category
+):
+    response = client.get("/sitemap.xml")
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "application/xml"
+    index = b"".join(response.streaming_content)
+    chunks = {post_chunk(post) for post in sitemap_posts}
+    assert len(chunks) > 1, "Посты должны разойтись по нескольким файлам."
+    for name in chunks:
+        assert f"https://blogicum.test/sitemaps/{name}".encode() in index
+    for post in sitemap_posts:
+        assert post_loc(post) in get_file(client, post_chunk(post))
+    category_chunk = (
+        f"sitemap-categories-{(published_category.id - 1) // CHUNK_SIZE}.xml"
+    )
+    profile_chunk = f"sitemap-profiles-{(user.id - 1) // CHUNK_SIZE}.xml"
+    assert published_category.slug.encode() in get_file(client, category_chunk)
+    assert user.username.encode() in get_file(client, profile_chunk)
+    assert client.get("/sitemaps/sitemap-comments-0.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+def test_new_post_rewrites_only_its_chunk(
+    client: Client, mixer: Mixer, sitemap_posts, sitemap_settings
+):
+    client.get("/sitemap.xml")
+    mtimes = {
+        entry.name: entry.stat().st_mtime_ns
+        for entry in os.scandir(sitemap_settings)
+        if entry.name.startswith("sitemap-posts-")
+    }
+    time.sleep(0.01)
+    post = mixer.blend(
+        "blog.Post",
+        author=sitemap_posts[0].author,
+        category=sitemap_posts[0].category,
+        is_published=True,
+        pub_date=datetime.now(tz=pytz.UTC) - timedelta(minutes=1),
+    )
+    for name, mtime in mtimes.items():
+        changed = (sitemap_settings / name).stat().st_mtime_ns != mtime
+        assert changed == (name == post_chunk(post)), (
+            "Убедитесь, что новый пост переписывает только свой файл карты."
+        )
+    assert post_loc(post) in get_file(client, post_chunk(post))
+
+    post.is_published = False
+    post.save()
+    assert post_loc(post) not in (
+        (sitemap_settings / post_chunk(post)).read_bytes()
+        if (sitemap_settings / post_chunk(post)).exists()
+        else b""
+    )
+
+
+def test_scheduled_post_appears_when_due(
+    client: Client, mixer: Mixer, sitemap_posts, sitemap_settings
+):
+    from blog.models import Post
+
+    now = datetime.now(tz=pytz.UTC)
+    scheduled = mixer.blend(
+        "blog.Post",
+        author=sitemap_posts[0].author,
+        category=sitemap_posts[0].category,
+        is_published=True,
+        pub_date=now + timedelta(days=1),
+    )
+    client.get("/sitemap.xml")
+    chunk = sitemap_settings / post_chunk(scheduled)
+    assert not chunk.exists() or post_loc(scheduled) not in chunk.read_bytes()
+    Post.objects.filter(pk=scheduled.pk).update(
+        pub_date=now - timedelta(minutes=1)
+    )
+    built_at = (now - timedelta(hours=1)).timestamp()
+    os.utime(sitemap_settings / "sitemap.xml", (built_at, built_at))
+    client.get("/sitemap.xml")
+    assert post_loc(scheduled) in get_file(client, post_chunk(scheduled))
+
+
+def test_keyset_iteration(sitemap_posts, django_assert_num_queries):
+    from blog.models import Post
+    from blog.sitemaps import iterate_rows
+
+    ids = sorted(post.id for post in sitemap_posts)
+    rows = Post.objects.values_list("pk")
+    with django_assert_num_queries(3):
+        found = [
+            row[0]
+            for row in iterate_rows(rows, ids[0], ids[-1], batch_size=2)
+        ]
+    assert found == ids
+
+
+def test_cold_start_builds_in_background(
+    settings, client: Client, sitemap_settings
+):
+    settings.BLOG_BACKGROUND_TASKS = True
+    for _ in range(2):
+        response = client.get("/sitemap.xml")
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE, (
+            "Пока карта строится в фоне, запрос не должен её строить сам."
+        )
+        assert response.has_header("Retry-After")
+    assert not (sitemap_settings / "sitemap.xml").exists()
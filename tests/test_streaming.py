@@ -0,0 +1,73 @@
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_STREAMING_FEEDS=True)
+def test_streaming_feeds(
+    user, user_client: Client, many_posts_with_published_locations
+):
+    for url in ("/", f"/profile/{user.username}/"):
+        response = user_client.get(url)
+        assert response.streaming, (
+            f"Убедитесь, что при BLOG_STREAMING_FEEDS страница `{url}`"
+            " отдаётся потоком."
+        )
+        chunks = [chunk.decode("utf-8") for chunk in response]
+        assert "<header>" in chunks[0] and "card-title" not in chunks[0], (
+            "Убедитесь, что первым фрагментом потока уходят"
+            " <head> и шапка страницы без карточек публикаций."
+        )
+        assert sum("card-title" in chunk for chunk in chunks) == 10, (
+            "Убедитесь, что карточки публикаций отдаются потоком"
+            " отдельными фрагментами."
+        )
+        assert "</html>" in chunks[-1]
+
+
+@override_settings(BLOG_STREAMING_FEEDS=True)
+def test_streaming_feed_selects_cards_after_head(
+    user_client: Client, many_posts_with_published_locations
+):
+    response = user_client.get("/")
+    chunks = iter(response)
+    next(chunks)
+    with CaptureQueriesContext(connection) as queries:
+        rest = b"".join(chunks).decode("utf-8")
+    assert any('"blog_post"."excerpt"' in q["sql"] for q in queries), (
+        "Убедитесь, что публикации ленты выбираются уже после отправки"
+        " начала страницы."
+    )
+    assert rest.count("card-title") == 10
+    assert 'aria-label="Page navigation"' in rest
+
+
+@override_settings(BLOG_STREAMING_FEEDS=True)
+def test_streamed_page_is_cached_for_anonymous(
+    client: Client, many_posts_with_published_locations
+):
+    first = client.get("/")
+    assert first.streaming
+    content = b"".join(first)
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get("/")
+    assert not second.streaming and second.content == content, (
+        "Убедитесь, что отданная потоком до конца страница сохраняется"
+        " в кеш страниц для анонимов."
+    )
+    assert not any('"blog_post"."excerpt"' in q["sql"] for q in queries)
+    assert second["ETag"] == first["ETag"]
+
+
+@override_settings(BLOG_STREAMING_FEEDS=True)
+def test_unfinished_stream_is_not_cached(
+    client: Client, many_posts_with_published_locations
+):
+    next(iter(client.get("/")))
+    assert client.get("/").streaming, (
+        "Убедитесь, что оборванный поток не попадает в кеш страниц."
+    )